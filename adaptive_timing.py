@@ -0,0 +1,85 @@
+"""
+Adaptive timing for the download loop.
+
+Learns how fast NinjaTrader actually reacts to a click and finishes a
+download in this session, and shrinks the outcome window and the poll
+intervals from MiningConfig to a safe margin above what it has seen. Any
+timing failure (no reaction, late error, button stuck disabled) snaps
+them back to the configured values until enough fresh samples have been
+collected. The instrument settle and the throttle after each download
+are not measured by anything, so they stay at their configured values.
+"""
+from collections import deque
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sequence (pct in 0-100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    rank = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return ordered[rank]
+
+
+class AdaptiveTiming:
+    def __init__(self, config, enabled=True, window=50, min_samples=5, margin=1.5):
+        self.config = config
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.margin = margin
+        self.reaction = deque(maxlen=window)    # Click -> button disabled / popup
+        self.completion = deque(maxlen=window)  # Download start -> button enabled again
+        self.cooldown = min_samples             # Samples to collect before trusting the percentiles
+
+        self.min_outcome_timeout = 0.5
+        self.outcome_slack = 0.2     # Added on top of the learned reaction window
+        self.min_poll = 0.05
+
+    # === Observations ===
+    def record_reaction(self, seconds):
+        self.reaction.append(seconds)
+        if self.cooldown:
+            self.cooldown -= 1
+
+    def record_completion(self, seconds):
+        self.completion.append(seconds)
+
+    def record_error(self):
+        """Back off: a wait was too short or the app misbehaved."""
+        self.cooldown = self.min_samples
+
+    @property
+    def learning(self):
+        return not self.enabled or self.cooldown > 0 or len(self.reaction) < self.min_samples
+
+    # === Current waits ===
+    @property
+    def outcome_timeout(self):
+        if self.learning:
+            return self.config.outcome_timeout
+        learned = percentile(self.reaction, 95) * self.margin + self.outcome_slack
+        return min(self.config.outcome_timeout, max(self.min_outcome_timeout, learned))
+
+    @property
+    def download_poll(self):
+        """Poll about ten times per typical download, never slower than configured."""
+        if not self.enabled or len(self.completion) < self.min_samples:
+            return self.config.download_poll
+        learned = percentile(self.completion, 50) / 10.0
+        return min(self.config.download_poll, max(self.min_poll, learned))
+
+    @property
+    def ready_poll(self):
+        if not self.enabled:
+            return self.config.ready_poll
+        return min(self.config.ready_poll, self.download_poll)
+
+    def describe(self):
+        if not self.reaction:
+            return "Timing: no samples yet"
+        parts = [f"reaction p95 {percentile(self.reaction, 95):.2f}s"]
+        if self.completion:
+            parts.append(f"download p50 {percentile(self.completion, 50):.2f}s")
+        parts.append(f"outcome window {self.outcome_timeout:.2f}s")
+        parts.append(f"poll {self.download_poll:.2f}s")
+        return "Timing: " + ", ".join(parts)
@@ -0,0 +1,216 @@
+"""
+Multi-symbol batch queue.
+
+Runs several contract chains back to back in one session, reusing the
+already-hooked Historical Data window. Jobs can be added, reordered,
+paused and resumed while the batch is running.
+"""
+import itertools
+import threading
+
+from contract_utils import get_front_contract, parse_nt8_contract
+from mining_engine import MiningConfig
+from mining_events import EventBus, LogMessage, Progress
+from parallel_miner import create_miner
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_job_ids = itertools.count(1)
+
+
+class BatchJob:
+    def __init__(self, contract, depth=4, mode="deep", search_mode="walk", stop_loss_limit=5):
+        # A bare root symbol ("ES") means its current front month
+        contract = contract.strip()
+        if " " not in contract:
+            contract = get_front_contract(contract)
+        parse_nt8_contract(contract)  # Fail early on a malformed contract
+        self.id = next(_job_ids)
+        self.contract = contract
+        self.depth = depth
+        self.mode = mode
+        self.search_mode = search_mode
+        self.stop_loss_limit = stop_loss_limit
+        self.status = JOB_PENDING
+        self.summary = None
+
+    @classmethod
+    def from_spec(cls, spec, **defaults):
+        """
+        Parses 'CONTRACT[:DEPTH[:MODE]]', e.g. 'ES', 'NQ 03-26:2' or 'CL:6:single'.
+        Missing fields fall back to defaults.
+        """
+        parts = [p.strip() for p in spec.split(":")]
+        kwargs = dict(defaults)
+        if len(parts) > 1 and parts[1]:
+            kwargs["depth"] = int(parts[1])
+        if len(parts) > 2 and parts[2]:
+            kwargs["mode"] = parts[2]
+        return cls(parts[0], **kwargs)
+
+    def to_config(self, **overrides):
+        """MiningConfig for this job; overrides set any other MiningConfig attribute (replay_root, throttle, ...)."""
+        config = MiningConfig(self.contract, max_contracts_back=self.depth, stop_loss_limit=self.stop_loss_limit,
+                              mode=self.mode, search_mode=self.search_mode)
+        for name, value in overrides.items():
+            if not hasattr(config, name):
+                raise AttributeError(f"Unknown MiningConfig setting: {name}")
+            setattr(config, name, value)
+        return config
+
+    def describe(self):
+        depth = self.mode if self.mode in ("single", "topup") else f"{self.depth} back"
+        return f"{self.contract:<10} {depth:<8} {self.status}"
+
+
+class BatchQueue:
+    """Thread-safe ordered job list shared by the GUI and the runner."""
+
+    def __init__(self, on_change=None):
+        self._lock = threading.Lock()
+        self._jobs = []
+        self.on_change = on_change or (lambda: None)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def has_pending(self):
+        with self._lock:
+            return any(job.status == JOB_PENDING for job in self._jobs)
+
+    def add(self, job):
+        with self._lock:
+            self._jobs.append(job)
+        self.on_change()
+        return job
+
+    def _find(self, job_id):
+        for i, job in enumerate(self._jobs):
+            if job.id == job_id:
+                return i, job
+        return None, None
+
+    def remove(self, job_id):
+        """Removes a job that is not running."""
+        with self._lock:
+            i, job = self._find(job_id)
+            if job is None or job.status == JOB_RUNNING:
+                return False
+            del self._jobs[i]
+        self.on_change()
+        return True
+
+    def move(self, job_id, offset):
+        """Moves a job up (negative offset) or down the queue."""
+        with self._lock:
+            i, job = self._find(job_id)
+            if job is None:
+                return False
+            j = max(0, min(len(self._jobs) - 1, i + offset))
+            self._jobs.insert(j, self._jobs.pop(i))
+        self.on_change()
+        return True
+
+    def set_status(self, job_id, status):
+        with self._lock:
+            i, job = self._find(job_id)
+            if job:
+                job.status = status
+        self.on_change()
+        return job
+
+    def pause(self, job_id):
+        return self.set_status(job_id, JOB_PAUSED)
+
+    def resume(self, job_id):
+        with self._lock:
+            i, job = self._find(job_id)
+            if job and job.status == JOB_PAUSED:
+                job.status = JOB_PENDING
+        self.on_change()
+        return job
+
+    def next_job(self):
+        """Marks the first pending job as running and returns it (None when nothing is pending)."""
+        with self._lock:
+            for job in self._jobs:
+                if job.status == JOB_PENDING:
+                    job.status = JOB_RUNNING
+                    break
+            else:
+                job = None
+        self.on_change()
+        return job
+
+
+class BatchRunner:
+    """
+    Runs queued jobs back to back until the queue has nothing pending.
+    driver may be a list of drivers, one per window, to run each job on a window pool.
+    """
+
+    def __init__(self, queue, driver, log=None, progress=None, config_overrides=None, events=None):
+        self.queue = queue
+        self.drivers = list(driver) if isinstance(driver, (list, tuple)) else [driver]
+        self.events = events or EventBus()
+        if log:
+            self.events.subscribe(lambda e: log(e.text), [LogMessage])
+        if progress:
+            self.events.subscribe(lambda e: progress(e.text), [Progress])
+        self.config_overrides = config_overrides or {}
+        self.engine = None
+        self.current_job = None
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+        if self.engine:
+            self.engine.stop()
+
+    def log(self, text):
+        self.events.publish(LogMessage(text))
+
+    def pause(self, job_id):
+        """Pauses a job; if it is the one running, its engine stops after the current date."""
+        self.queue.pause(job_id)
+        if self.current_job and self.current_job.id == job_id and self.engine:
+            self.engine.stop()
+
+    def run(self):
+        """Returns the list of finished jobs."""
+        finished = []
+        while not self.stop_requested:
+            job = self.queue.next_job()
+            if job is None:
+                break
+
+            self.log(f"\n### BATCH JOB {job.id}: {job.contract} ###")
+            self.current_job = job
+            try:
+                self.engine = create_miner(job.to_config(**self.config_overrides), self.drivers, events=self.events)
+                job.summary = self.engine.run()
+            except Exception as e:
+                # Never leave the job "running": the GUI could neither remove nor re-run it
+                self.log(f"ERROR: {e}")
+                job.summary = {"contracts": [], "downloaded": 0, "stopped": False, "error": str(e) or type(e).__name__}
+            self.engine = None
+            self.current_job = None
+
+            if job.status == JOB_PAUSED:
+                continue  # Paused mid-run; ledger and disk index let it resume later
+            if self.stop_requested:
+                self.queue.set_status(job.id, JOB_PENDING)
+                break
+            self.queue.set_status(job.id, JOB_FAILED if job.summary["error"] else JOB_DONE)
+            finished.append(job)
+            if job.summary["error"]:
+                # The window is gone; nothing else in the queue can run either
+                break
+
+        self.log(f"\n✓ BATCH COMPLETE ({len(finished)} jobs)")
+        return finished
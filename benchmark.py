@@ -0,0 +1,176 @@
+"""
+Throughput benchmark of the full mining loop against the simulator.
+
+    python -m benchmark                  # run and compare with benchmark_baseline.json
+    python -m benchmark --save-baseline  # run and store the results as the new baseline
+    python -m benchmark --scenario flaky --scale 0.1
+
+Every scenario mines a deep-history chain into a temporary replay tree.
+All latencies and engine waits are multiplied by --scale, and the results
+are reported in unscaled (simulated) time, so a short run stands in for a
+real one. Reported per scenario: sessions per minute, wasted-attempt ratio
+(attempts that landed no file) and wall time per contract. The boundary
+search must land as many files as the walk with no more attempts.
+Exit codes: 0 ok, 1 regression against the baseline.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+from mining_engine import MiningConfig, MiningEngine
+from mining_events import ContractFinished, DateOutcome
+from nt8_simulator import Latency, SimulatedHistoricalData
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Engine settings that are durations (scaled with --scale)
+TIMING_FIELDS = ("settle_delay", "ready_timeout", "ready_poll", "outcome_timeout", "outcome_poll",
+                 "download_poll", "throttle", "recheck_delay", "stall_timeout",
+                 "retry_base_delay", "retry_max_delay")
+ADAPTIVE_FIELDS = ("min_outcome_timeout", "outcome_slack", "min_poll")
+
+# Regression thresholds against the baseline
+MAX_THROUGHPUT_DROP = 0.15   # sessions/min may drop by up to 15%
+MAX_WASTE_INCREASE = 0.05    # wasted-attempt ratio may rise by up to 5 points
+
+SCENARIOS = {
+    "walk": dict(search_mode="walk"),
+    "boundary": dict(search_mode="boundary"),
+    "flaky": dict(search_mode="walk", no_reaction_rate=0.05, stall_rate=0.03),
+}
+
+
+def run_scenario(name, scale=0.05, seed=1):
+    """Runs one scenario in a temp replay tree. Returns its result dict."""
+    options = dict(SCENARIOS[name])
+    search_mode = options.pop("search_mode")
+    root = tempfile.mkdtemp(prefix="nt8_bench_")
+    try:
+        config = MiningConfig("ES 03-26", max_contracts_back=3, search_mode=search_mode,
+                              replay_root=root, start_date=date(2026, 1, 16), ledger_path="")
+        config.metrics_dir = ""
+        config.profile = None
+        for field in TIMING_FIELDS:
+            setattr(config, field, getattr(config, field) * scale)
+
+        sim = SimulatedHistoricalData(root, first_available=date(2025, 8, 4),
+                                      no_data_dates={date(2025, 11, 11), date(2025, 12, 2)},
+                                      reaction=Latency(0.3, 0.4).scaled(scale),
+                                      download=Latency(2.0, 0.5).scaled(scale),
+                                      seed=seed, **options)
+        engine = MiningEngine(config, sim)
+        for field in ADAPTIVE_FIELDS:
+            setattr(engine.timing, field, getattr(engine.timing, field) * scale)
+
+        attempts = []
+        contract_times = {}
+        marker = [time.monotonic()]
+
+        def on_contract(event):
+            now = time.monotonic()
+            contract_times[event.contract] = round((now - marker[0]) / scale, 1)
+            marker[0] = now
+
+        engine.events.subscribe(attempts.append, [DateOutcome])
+        engine.events.subscribe(on_contract, [ContractFinished])
+
+        started = time.monotonic()
+        summary = engine.run()
+        wall = (time.monotonic() - started) / scale
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    wasted = sum(1 for a in attempts if not a.landed)
+    return {
+        "downloaded": summary["downloaded"],
+        "attempts": len(attempts),
+        "sessions_per_min": round(summary["downloaded"] / (wall / 60.0), 2) if wall else 0.0,
+        "wasted_ratio": round(wasted / len(attempts), 3) if attempts else 0.0,
+        "wall_seconds": round(wall, 1),
+        "contract_seconds": contract_times,
+    }
+
+
+def check_boundary(results):
+    """
+    The boundary search must not lose sessions the walk finds (a data hole is
+    not the start of history) and must not cost more attempts than the walk.
+    """
+    walk, boundary = results.get("walk"), results.get("boundary")
+    if not (walk and boundary):
+        return []
+    problems = []
+    if boundary["downloaded"] < walk["downloaded"]:
+        problems.append(f"boundary: downloaded {boundary['downloaded']} (walk {walk['downloaded']})")
+    if boundary["attempts"] > walk["attempts"]:
+        problems.append(f"boundary: {boundary['attempts']} attempts (walk {walk['attempts']})")
+    return problems
+
+
+def compare(results, baseline):
+    """Returns a list of regression messages (empty when everything is within bounds)."""
+    problems = check_boundary(results)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["sessions_per_min"] < base["sessions_per_min"] * (1 - MAX_THROUGHPUT_DROP):
+            problems.append(f"{name}: {result['sessions_per_min']} sessions/min "
+                            f"(baseline {base['sessions_per_min']})")
+        if result["wasted_ratio"] > base["wasted_ratio"] + MAX_WASTE_INCREASE:
+            problems.append(f"{name}: wasted ratio {result['wasted_ratio']} (baseline {base['wasted_ratio']})")
+        if result["downloaded"] < base["downloaded"]:
+            problems.append(f"{name}: downloaded {result['downloaded']} (baseline {base['downloaded']})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark", description="Mining loop throughput benchmark")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--scale", type=float, default=0.05, help="Time scale for latencies and waits (default 0.05)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenario or sorted(SCENARIOS):
+        results[name] = run_scenario(name, args.scale, args.seed)
+        r = results[name]
+        print(f"{name:<10} {r['sessions_per_min']:>7.2f} sessions/min | wasted {r['wasted_ratio']:.1%} | "
+              f"{r['downloaded']}/{r['attempts']} landed | {r['wall_seconds']:.0f}s", file=sys.stderr)
+        for contract, seconds in r["contract_seconds"].items():
+            print(f"  {contract:<10} {seconds:>7.1f}s", file=sys.stderr)
+
+    if args.save_baseline:
+        problems = check_boundary(results)
+        if problems:
+            for problem in problems:
+                print(f"REGRESSION {problem} (baseline not saved)", file=sys.stderr)
+            return 1
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"Baseline saved: {args.baseline}", file=sys.stderr)
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("No baseline to compare with (run with --save-baseline)", file=sys.stderr)
+        return 0
+
+    problems = compare(results, baseline)
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
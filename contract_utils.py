@@ -1,11 +1,63 @@
+from collections import namedtuple
 from datetime import date, timedelta
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta, FR
 
+from trading_calendar import is_business_day
+
+# Listing cycle (contract months), expiry rule and approximate volume roll
+# (calendar days before expiry when the next contract becomes front month).
+ProductSpec = namedtuple("ProductSpec", ["cycle", "expiry_rule", "roll_offset"])
+
+QUARTERLY = (3, 6, 9, 12)
+MONTHLY = tuple(range(1, 13))
+BIMONTHLY = (2, 4, 6, 8, 10, 12)
+
+EQUITY_SPEC = ProductSpec(QUARTERLY, "third_friday", 8)
+ENERGY_SPEC = ProductSpec(MONTHLY, "energy", 7)
+METALS_SPEC = ProductSpec(BIMONTHLY, "third_last_business_day", 33)
+
+PRODUCT_SPECS = {
+    "ES": EQUITY_SPEC, "MES": EQUITY_SPEC,
+    "NQ": EQUITY_SPEC, "MNQ": EQUITY_SPEC,
+    "RTY": EQUITY_SPEC, "M2K": EQUITY_SPEC,
+    "YM": EQUITY_SPEC, "MYM": EQUITY_SPEC,
+    "CL": ENERGY_SPEC, "MCL": ENERGY_SPEC, "QM": ENERGY_SPEC,
+    "GC": METALS_SPEC, "MGC": METALS_SPEC,
+}
+
 def get_third_friday(year, month):
     """Calculates the 3rd Friday of a given month and year (Standard Futures Expiry)."""
     d = date(year, month, 1)
     return d + relativedelta(weekday=FR(3))
 
+def get_product_spec(symbol):
+    """Returns the ProductSpec for a root symbol. Unknown symbols are treated as quarterly equity index."""
+    return PRODUCT_SPECS.get(symbol, EQUITY_SPEC)
+
+def _business_days_before(day, count, symbol):
+    """Steps back `count` exchange business days from day."""
+    while count:
+        day -= timedelta(days=1)
+        if is_business_day(day, symbol):
+            count -= 1
+    return day
+
+def get_energy_expiry(symbol, year, month):
+    """
+    CL-style last trade: 3 business days before the 25th of the month prior
+    to the contract month (4 if the 25th is not a business day).
+    """
+    the_25th = date(year, month, 25) - relativedelta(months=1)
+    count = 3 if is_business_day(the_25th, symbol) else 4
+    return _business_days_before(the_25th, count, symbol)
+
+def get_third_last_business_day(symbol, year, month):
+    """GC-style last trade: third last business day of the contract month."""
+    month_end = date(year, month, 1) + relativedelta(months=1)
+    return _business_days_before(month_end, 3, symbol)
+
+@lru_cache(maxsize=None)
 def parse_nt8_contract(contract_str):
     """
     Parses a NinjaTrader 8 contract string (e.g., 'MNQ 09-25').
@@ -27,15 +79,19 @@ def parse_nt8_contract(contract_str):
         
     return symbol, month, year
 
+@lru_cache(maxsize=None)
 def get_previous_contract(contract_str):
     """
-    Returns the string for the previous quarterly contract.
-    E.g. "MNQ 03-26" -> "MNQ 12-25"
+    Returns the string for the previous contract in the symbol's listing cycle.
+    E.g. "MNQ 03-26" -> "MNQ 12-25", "CL 03-26" -> "CL 02-26", "GC 04-26" -> "GC 02-26"
     """
     symbol, month, year = parse_nt8_contract(contract_str)
+    cycle = get_product_spec(symbol).cycle
     
-    # Subtract 3 months
-    dt = date(year, month, 1) - relativedelta(months=3)
+    # Step back to the previous listed month
+    dt = date(year, month, 1) - relativedelta(months=1)
+    while dt.month not in cycle:
+        dt -= relativedelta(months=1)
     
     # Format back to "SYMBOL MM-YY"
     new_month = dt.month
@@ -43,25 +99,63 @@ def get_previous_contract(contract_str):
     
     return f"{symbol} {new_month:02d}-{new_year:02d}"
 
+@lru_cache(maxsize=None)
 def get_contract_expiry(contract_str):
-    """Returns the expiration date (3rd Friday) of the contract."""
+    """Returns the expiration (last trade) date of the contract according to its product spec."""
     symbol, month, year = parse_nt8_contract(contract_str)
+    rule = get_product_spec(symbol).expiry_rule
+    if rule == "energy":
+        return get_energy_expiry(symbol, year, month)
+    if rule == "third_last_business_day":
+        return get_third_last_business_day(symbol, year, month)
     return get_third_friday(year, month)
 
-def get_active_trading_period(contract_str):
+def get_roll_date(contract_str, roll_offset=None):
+    """
+    Approximate date volume rolls from this contract to the next one.
+    roll_offset (calendar days before expiry) defaults to the product spec's.
+    """
+    if roll_offset is None:
+        roll_offset = get_product_spec(parse_nt8_contract(contract_str)[0]).roll_offset
+    return get_contract_expiry(contract_str) - timedelta(days=roll_offset)
+
+def get_active_trading_period(contract_str, front_month=False, roll_offset=None):
     """
     Determines the active trading period for a given contract.
+    By default that runs from the previous contract's expiry to its own, so
+    neighbouring contracts share the weeks around each roll. With front_month
+    it is the front-month window instead (see get_front_month_period), and
+    every session belongs to exactly one contract.
     Returns (start_date, end_date).
     """
-    symbol, month, year_full = parse_nt8_contract(contract_str)
-    current_expiry = get_third_friday(year_full, month)
-    
-    prev_date = current_expiry - relativedelta(months=3)
-    prev_expiry = get_third_friday(prev_date.year, prev_date.month)
+    if front_month:
+        return get_front_month_period(contract_str, roll_offset)
+    current_expiry = get_contract_expiry(contract_str)
+    prev_expiry = get_contract_expiry(get_previous_contract(contract_str))
     
     return prev_expiry, current_expiry
 
+def get_front_month_period(contract_str, roll_offset=None):
+    """
+    Days the contract is the front month: from the previous contract's roll
+    date to the day before its own. Returns (start_date, end_date).
+    """
+    return (get_roll_date(get_previous_contract(contract_str), roll_offset),
+            get_roll_date(contract_str, roll_offset) - timedelta(days=1))
+
 def get_last_n_days(days=90):
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     return start_date, end_date
+
+def get_front_contract(symbol, on=None, roll_offset=None):
+    """Returns the front-month contract for a root symbol on a date (default today), e.g. 'ES' -> 'ES 03-26'."""
+    on = on or date.today()
+    cycle = get_product_spec(symbol).cycle
+    dt = date(on.year, on.month, 1)
+    while True:
+        if dt.month in cycle:
+            contract = f"{symbol} {dt.month:02d}-{dt.year % 100:02d}"
+            if get_roll_date(contract, roll_offset) > on:
+                return contract
+        dt += relativedelta(months=1)
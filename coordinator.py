@@ -0,0 +1,494 @@
+"""
+Coordinator/worker mode: one deep-history mine split across several machines.
+
+The coordinator plans the chain against a merged archive folder and hands
+out (contract, date) leases over plain HTTP/JSON. Each worker runs a
+MiningEngine on its own NinjaTrader (or the simulator), and heartbeats
+while a date is downloading. It reports the result together with the
+file's size and SHA-256, and can upload the file itself. A lease whose
+heartbeats stop expires and the date is handed out again. The manifest
+of every landed file (which worker has it, size and hash) is written
+next to the archive.
+
+    python -m coordinator serve --contract "ES 03-26" --depth 4 --archive D:\\merged_replay
+    python -m coordinator work --url http://10.0.0.5:8765 --upload
+    python -m coordinator work --url http://127.0.0.1:8765 --simulate   # local test, no NinjaTrader
+    python -m coordinator need --url http://10.0.0.5:8765 "ES 03-26 2025-12-01 2025-12-19"
+
+Endpoints (JSON bodies; send X-Miner-Token when the coordinator has a token):
+    POST /lease      {worker, contract?}                 -> {lease: {id, contract, date, ttl} | null, done}
+    POST /heartbeat  {worker, lease}                     -> {ok}
+    POST /complete   {worker, lease, result, manifest?}  -> {ok}
+    POST /needs      {ranges: ["ES 03-26 2025-12-01 2025-12-19", ...]} -> {ok, added}
+    PUT  /file/<lease>  raw .nrd bytes (X-Content-SHA256) -> {ok}
+    GET  /status                                         -> counters
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mining_engine import (MiningConfig, MiningEngine, replay_filename,
+                           ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_TRANSIENT)
+from mining_events import EventBus, LogMessage
+from parallel_miner import DateWorkQueue
+from retry_queue import RetryQueue
+from work_priority import PriorityPolicy, parse_needed_range
+from run_ledger import RESULT_DOWNLOADED, RESULT_NO_DATA
+
+DEFAULT_PORT = 8765
+TOKEN_HEADER = "X-Miner-Token"
+HASH_HEADER = "X-Content-SHA256"
+
+Lease = namedtuple("Lease", ["id", "item", "worker", "expires"])
+
+
+def file_digest(path):
+    """(size, sha256) of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return os.path.getsize(path), digest.hexdigest()
+
+
+# === Coordinator ===
+class Coordinator:
+    def __init__(self, config, lease_ttl=60.0, log=None):
+        """config.replay_root is the merged archive: planned against, and where uploads land."""
+        self.config = config
+        self.lease_ttl = lease_ttl
+        self.events = EventBus()
+        if log:
+            self.events.subscribe(lambda e: log(e.text), [LogMessage])
+        self.planner = MiningEngine(config, None, events=self.events)
+        self.plan = self.planner.plan()
+        # Always prioritised, so needed ranges can be posted while the mine runs
+        self.policy = PriorityPolicy(config.priority, config.recent_days, config.needs_path,
+                                     config.start_date, self.log)
+        self.work = DateWorkQueue(self.plan, config.stop_loss_limit,
+                                  RetryQueue(config.retry_base_delay, config.retry_max_delay, config.retry_attempts),
+                                  self.policy)
+        self._lock = threading.Lock()
+        self._lease_ids = itertools.count(1)
+        self.leases = {}
+        self.manifest = {}   # "contract/YYYYMMDD.nrd" -> {worker, size, sha256, uploaded}
+        self.workers = {}    # worker -> last request time
+        self.counts = {ATTEMPT_HIT: 0, ATTEMPT_NO_DATA: 0, ATTEMPT_TRANSIENT: 0, "expired": 0}
+
+    def log(self, text):
+        self.events.publish(LogMessage(text))
+
+    def _seen(self, worker):
+        self.workers[worker] = time.time()
+
+    def lease(self, worker, preferred=None):
+        self.expire()
+        item = self.work.next_item(preferred, block=False)
+        if item is None:
+            return {"lease": None, "done": self.work.finished()}
+        with self._lock:
+            self._seen(worker)
+            lease = Lease(str(next(self._lease_ids)), item, worker, time.monotonic() + self.lease_ttl)
+            self.leases[lease.id] = lease
+        contract, day, attempts = item
+        self.log(f"Lease {lease.id}: {contract} {day} -> {worker}")
+        return {"lease": {"id": lease.id, "contract": contract, "date": day.isoformat(),
+                          "attempts": attempts, "ttl": self.lease_ttl}, "done": False}
+
+    def heartbeat(self, worker, lease_id):
+        with self._lock:
+            self._seen(worker)
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.worker != worker:
+                return {"ok": False, "error": "Unknown or expired lease"}
+            self.leases[lease_id] = lease._replace(expires=time.monotonic() + self.lease_ttl)
+        return {"ok": True}
+
+    def complete(self, worker, lease_id, result, manifest=None):
+        with self._lock:
+            self._seen(worker)
+            lease = self.leases.pop(lease_id, None)
+            if lease is None or lease.worker != worker:
+                return {"ok": False, "error": "Unknown or expired lease"}
+            if result not in self.counts or result == "expired":
+                self.leases[lease_id] = lease
+                return {"ok": False, "error": f"Unknown result '{result}'"}
+            self.counts[result] += 1
+            contract, day, _ = lease.item
+            if result == ATTEMPT_HIT and manifest:
+                key = f"{contract}/{replay_filename(day)}"
+                entry = self.manifest.setdefault(key, {"uploaded": False})
+                entry.update(worker=worker, size=manifest.get("size"), sha256=manifest.get("sha256"))
+        self.work.complete(lease.item, result)
+        ledger = self.planner.ledger
+        if ledger and result != ATTEMPT_TRANSIENT:
+            ledger.record(contract, day, RESULT_DOWNLOADED if result == ATTEMPT_HIT else RESULT_NO_DATA)
+        self.log(f"Lease {lease_id}: {contract} {day} {result} ({worker})")
+        return {"ok": True}
+
+    def add_needs(self, lines):
+        """Adds needed ranges ('ES 03-26 2025-12-01 2025-12-19'); the next leases hand them out first."""
+        try:
+            ranges = [parse_needed_range(line) for line in lines]
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        for needed in ranges:
+            self.policy.add(*needed)
+        return {"ok": True, "added": len(ranges)}
+
+    def store_file(self, lease_id, data, sha256):
+        """Saves an uploaded .nrd into the archive, checked against the sender's hash."""
+        with self._lock:
+            lease = self.leases.get(lease_id)
+        if lease is None:
+            return {"ok": False, "error": "Unknown or expired lease"}
+        if hashlib.sha256(data).hexdigest() != sha256:
+            return {"ok": False, "error": "Hash mismatch"}
+        contract, day, _ = lease.item
+        folder = self.planner.index.contract_dir(contract)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, replay_filename(day))
+        with open(path + ".part", "wb") as f:
+            f.write(data)
+        os.replace(path + ".part", path)
+        self.planner.index.add(contract, day)
+        with self._lock:
+            key = f"{contract}/{replay_filename(day)}"
+            self.manifest.setdefault(key, {})["uploaded"] = True
+        return {"ok": True}
+
+    def expire(self):
+        """Hands the dates of leases without a recent heartbeat out again."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [lease for lease in self.leases.values() if lease.expires < now]
+            for lease in expired:
+                del self.leases[lease.id]
+                self.counts["expired"] += 1
+        for lease in expired:
+            self.log(f"Lease {lease.id} expired ({lease.worker}), re-queued")
+            self.work.complete(lease.item, ATTEMPT_TRANSIENT)
+
+    def finished(self):
+        return self.work.finished()
+
+    def status(self):
+        with self._lock:
+            return {"leases": len(self.leases), "workers": sorted(self.workers), "results": dict(self.counts),
+                    "files": len(self.manifest), "retries": len(self.work.retries), "finished": self.finished()}
+
+    def save_manifest(self, path):
+        with self._lock:
+            data = {"generated_at": time.time(), "files": dict(sorted(self.manifest.items()))}
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(path + ".tmp", path)
+        return path
+
+
+def make_handler(coordinator, token=None):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass  # Requests are logged through the coordinator
+
+        def _reply(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorised(self):
+            if token and self.headers.get(TOKEN_HEADER) != token:
+                self._reply({"ok": False, "error": "Bad token"}, 403)
+                return False
+            return True
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_GET(self):
+            if not self._authorised():
+                return
+            if self.path == "/status":
+                self._reply(coordinator.status())
+            else:
+                self._reply({"ok": False, "error": "Not found"}, 404)
+
+        def do_POST(self):
+            if not self._authorised():
+                return
+            try:
+                payload = json.loads(self._body() or b"{}")
+                if self.path == "/needs":
+                    self._reply(coordinator.add_needs(payload["ranges"]))
+                    return
+                worker = payload["worker"]
+                if self.path == "/lease":
+                    self._reply(coordinator.lease(worker, payload.get("contract")))
+                elif self.path == "/heartbeat":
+                    self._reply(coordinator.heartbeat(worker, payload["lease"]))
+                elif self.path == "/complete":
+                    self._reply(coordinator.complete(worker, payload["lease"], payload["result"],
+                                                     payload.get("manifest")))
+                else:
+                    self._reply({"ok": False, "error": "Not found"}, 404)
+            except (KeyError, ValueError) as e:
+                self._reply({"ok": False, "error": f"Bad request: {e}"}, 400)
+
+        def do_PUT(self):
+            if not self._authorised():
+                return
+            if not self.path.startswith("/file/"):
+                self._reply({"ok": False, "error": "Not found"}, 404)
+                return
+            self._reply(coordinator.store_file(self.path[len("/file/"):], self._body(),
+                                               self.headers.get(HASH_HEADER, "")))
+
+    return Handler
+
+
+def serve(coordinator, host="127.0.0.1", port=DEFAULT_PORT, token=None):
+    """Starts the HTTP server on a background thread and returns it (call shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(coordinator, token))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# === Worker ===
+class CoordinatorClient:
+    def __init__(self, url, token=None, timeout=30.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _call(self, method, path, payload=None, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        if payload is not None:
+            data = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read() or b"{}")
+
+    def lease(self, worker, contract=None):
+        return self._call("POST", "/lease", {"worker": worker, "contract": contract})
+
+    def heartbeat(self, worker, lease_id):
+        return self._call("POST", "/heartbeat", {"worker": worker, "lease": lease_id})
+
+    def complete(self, worker, lease_id, result, manifest=None):
+        return self._call("POST", "/complete", {"worker": worker, "lease": lease_id, "result": result,
+                                                "manifest": manifest})
+
+    def upload(self, lease_id, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        return self._call("PUT", f"/file/{lease_id}", data=data,
+                          headers={HASH_HEADER: hashlib.sha256(data).hexdigest(),
+                                   "Content-Type": "application/octet-stream"})
+
+    def add_needs(self, lines):
+        return self._call("POST", "/needs", {"ranges": list(lines)})
+
+    def status(self):
+        return self._call("GET", "/status")
+
+
+class RemoteWorker:
+    """Mines leased dates with a local engine until the coordinator reports the mine done."""
+
+    def __init__(self, client, config, driver, worker_id=None, upload=False, log=None, idle_poll=2.0):
+        self.client = client
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.upload = upload
+        self.idle_poll = idle_poll
+        self.engine = MiningEngine(config, driver, log=log)
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+        self.engine.stop()
+
+    def log(self, text):
+        self.engine.log(text)
+
+    def _heartbeat(self, lease_id, ttl, done):
+        while not done.wait(ttl / 3.0):
+            try:
+                if not self.client.heartbeat(self.worker_id, lease_id).get("ok"):
+                    return
+            except OSError:
+                pass  # The coordinator may be briefly unreachable; the lease covers ttl
+
+    def run(self):
+        """Returns {"attempted": n, "downloaded": n, "error": str or None}."""
+        summary = {"attempted": 0, "downloaded": 0, "error": None}
+        error = self.engine.driver.connect()
+        if error:
+            self.log(f"ERROR: {error}")
+            summary["error"] = error
+            return summary
+
+        while not self.stop_requested:
+            try:
+                reply = self.client.lease(self.worker_id, self.engine.current_contract)
+            except OSError as e:
+                self.log(f"Coordinator unreachable: {e}")
+                summary["error"] = str(e)
+                break
+            lease = reply.get("lease")
+            if lease is None:
+                if reply.get("done"):
+                    break
+                time.sleep(self.idle_poll)  # In-flight dates elsewhere may still add work
+                continue
+
+            contract, day = lease["contract"], date.fromisoformat(lease["date"])
+            done = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(lease["id"], lease["ttl"], done), daemon=True).start()
+            try:
+                if contract != self.engine.current_contract:
+                    self.engine.select_contract(contract)
+                result = self.engine.attempt_date(contract, day)
+            finally:
+                done.set()
+            summary["attempted"] += 1
+
+            manifest = None
+            if result == ATTEMPT_HIT:
+                summary["downloaded"] += 1
+                path = os.path.join(self.engine.index.contract_dir(contract), replay_filename(day))
+                if os.path.exists(path):
+                    size, sha256 = file_digest(path)
+                    manifest = {"size": size, "sha256": sha256}
+                    if self.upload:
+                        reply = self.client.upload(lease["id"], path)
+                        if not reply.get("ok"):
+                            self.log(f"  Upload failed: {reply.get('error')}")
+            reply = self.client.complete(self.worker_id, lease["id"], result, manifest)
+            if not reply.get("ok"):
+                self.log(f"  Result not accepted: {reply.get('error')}")
+        return summary
+
+
+# === Command line ===
+def build_parser():
+    parser = argparse.ArgumentParser(prog="coordinator", description="Split a deep-history mine across machines")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("serve", help="Plan the mine and hand out leases")
+    s.add_argument("--contract", required=True, help="Starting contract or root symbol")
+    s.add_argument("--depth", type=int, default=4)
+    s.add_argument("--mode", choices=("deep", "single", "topup"), default="deep")
+    s.add_argument("--stop-loss", type=int, default=5)
+    s.add_argument("--front-month", action="store_true", help="Each session under its front-month contract only")
+    s.add_argument("--priority", choices=("chain", "recent"), default="chain",
+                   help="Lease order: newest first per contract, or recent sessions of every contract first")
+    s.add_argument("--needs", metavar="FILE", help="Needed ranges leased first (re-read when the file changes)")
+    s.add_argument("--archive", required=True, help="Merged replay folder (planned against, uploads land here)")
+    s.add_argument("--ledger", help="Coordinator ledger path ('' disables it)")
+    s.add_argument("--host", default="127.0.0.1", help="Bind address (0.0.0.0 to accept other machines)")
+    s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    s.add_argument("--token", help="Shared secret the workers must send")
+    s.add_argument("--lease-ttl", type=float, default=60.0, help="Seconds a lease lives without a heartbeat")
+
+    w = sub.add_parser("work", help="Mine leased dates on this machine")
+    w.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    w.add_argument("--token")
+    w.add_argument("--worker-id")
+    w.add_argument("--replay-root", help="Local db/replay folder (default NinjaTrader's)")
+    w.add_argument("--upload", action="store_true", help="Send each landed file to the coordinator's archive")
+    w.add_argument("--simulate", action="store_true", help="Use the simulator and a temp replay tree (no NinjaTrader)")
+
+    n = sub.add_parser("need", help="Send needed ranges to a running coordinator")
+    n.add_argument("ranges", nargs="+", metavar="RANGE", help="'ES 03-26 2025-12-01 2025-12-19' or 'NQ 2025-11-03'")
+    n.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    n.add_argument("--token")
+    return parser
+
+
+def run_serve(args):
+    from batch_queue import BatchJob
+
+    job = BatchJob(args.contract, depth=args.depth, mode=args.mode, stop_loss_limit=args.stop_loss)
+    overrides = {"replay_root": args.archive, "front_month_only": args.front_month, "priority": args.priority,
+                 "needs_path": os.path.abspath(args.needs) if args.needs else None}
+    if args.ledger is not None:
+        overrides["ledger_path"] = args.ledger
+    coordinator = Coordinator(job.to_config(**overrides), args.lease_ttl,
+                              log=lambda text: print(text, file=sys.stderr, flush=True))
+    server = serve(coordinator, args.host, args.port, args.token)
+    print(f"Coordinator on http://{args.host}:{args.port} ({job.contract})", file=sys.stderr, flush=True)
+    try:
+        while not coordinator.finished():
+            time.sleep(1.0)
+            coordinator.expire()
+        time.sleep(3.0)  # Let idle workers pick up "done"
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    status = coordinator.status()
+    status["manifest"] = coordinator.save_manifest(os.path.join(args.archive, "manifest.json"))
+    print(json.dumps(status))
+    return 0
+
+
+def run_work(args):
+    client = CoordinatorClient(args.url, args.token)
+    replay_root = args.replay_root
+    if args.simulate:
+        from nt8_simulator import SimulatedHistoricalData
+
+        replay_root = replay_root or tempfile.mkdtemp(prefix="nt8_worker_")
+        driver = SimulatedHistoricalData(replay_root, seed=os.getpid())
+    else:
+        from nt8_driver import NT8WindowDriver  # Only real workers need pywinauto
+
+        driver = NT8WindowDriver()
+    # The contract in the config only matters for planning, which the coordinator does
+    config = MiningConfig("ES 03-26", replay_root=replay_root)
+    worker = RemoteWorker(client, config, driver, args.worker_id, args.upload,
+                          log=lambda text: print(text, file=sys.stderr, flush=True))
+    try:
+        summary = worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+        summary = {"error": "stopped"}
+    print(json.dumps(summary))
+    return 1 if summary.get("error") else 0
+
+
+def run_need(args):
+    reply = CoordinatorClient(args.url, args.token).add_needs(args.ranges)
+    print(json.dumps(reply))
+    return 0 if reply.get("ok") else 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    commands = {"serve": run_serve, "work": run_work, "need": run_need}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
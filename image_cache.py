@@ -0,0 +1,65 @@
+"""
+On-disk cache for resized GUI images.
+
+The instructions image is resized once with PIL and saved as a PNG that Tk
+can load directly, so normal launches neither import PIL nor run the
+LANCZOS resize.
+"""
+import hashlib
+import os
+import sys
+
+
+def get_resource_path(name):
+    """Path of a bundled data file (PyInstaller unpacks to sys._MEIPASS)."""
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, name)
+
+
+def get_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "cache")
+
+
+def _source_key(src_path):
+    """
+    Source mtime and size. A PyInstaller one-file build unpacks a fresh copy
+    (with a fresh mtime) on every start, so frozen builds key on content instead.
+    """
+    if getattr(sys, "frozen", False):
+        with open(src_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()[:16]
+    st = os.stat(src_path)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def get_resized_image(src_path, target_width, cache_dir=None):
+    """
+    Returns the path of a PNG copy of src_path scaled to target_width (aspect
+    ratio kept), creating it on the first call. Returns None if src_path is missing.
+    """
+    if not os.path.exists(src_path):
+        return None
+    cache_dir = cache_dir or get_cache_dir()
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    cached = os.path.join(cache_dir, f"{stem}_{target_width}_{_source_key(src_path)}.png")
+    if os.path.exists(cached):
+        return cached
+
+    from PIL import Image  # Only needed on a cache miss
+
+    os.makedirs(cache_dir, exist_ok=True)
+    raw_img = Image.open(src_path)
+    w_percent = target_width / float(raw_img.size[0])
+    h_size = int(float(raw_img.size[1]) * w_percent)
+    raw_img = raw_img.resize((target_width, h_size), Image.Resampling.LANCZOS)
+
+    tmp_path = cached + ".tmp"
+    raw_img.save(tmp_path, format="PNG")
+    os.replace(tmp_path, cached)
+
+    # Drop stale copies of the same image
+    for name in os.listdir(cache_dir):
+        if name.startswith(f"{stem}_{target_width}_") and os.path.join(cache_dir, name) != cached:
+            try: os.remove(os.path.join(cache_dir, name))
+            except OSError: pass
+    return cached
@@ -0,0 +1,73 @@
+"""
+Bounded, batched activity log for the Tk GUI.
+
+Worker threads only push lines into a thread-safe queue. The GUI drains it
+on a timer with a single insert, keeps at most max_lines visible and
+writes the full history to a rotating log file.
+"""
+import logging
+import os
+import queue
+import tkinter as tk
+from logging.handlers import RotatingFileHandler
+
+
+def get_default_log_path():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "miner.log")
+
+
+def create_file_logger(path, max_bytes=5 * 1024 * 1024, backups=5):
+    """Logger that keeps the complete run history in rotating files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    logger = logging.getLogger("nt8_replay_miner")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+class LogView:
+    def __init__(self, root, text_widget, max_lines=2000, interval_ms=100, log_path=None):
+        self.root = root
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self.pending = queue.SimpleQueue()
+        try:
+            self.file_log = create_file_logger(log_path or get_default_log_path())
+        except OSError as e:
+            print(f"Could not open log file: {e}")
+            self.file_log = None
+
+    def push(self, msg):
+        """Safe to call from any thread."""
+        self.pending.put(msg)
+
+    def start(self):
+        self.root.after(self.interval_ms, self._drain)
+
+    def _drain(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self.pending.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            if self.file_log:
+                for line in lines:
+                    self.file_log.info(line)
+            self.text.config(state="normal")
+            self.text.insert(tk.END, "\n".join(lines) + "\n")
+            # Keep the widget bounded: drop the oldest lines
+            line_count = int(self.text.index("end-1c").split(".")[0])
+            if line_count > self.max_lines:
+                self.text.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+            self.text.see(tk.END)
+            self.text.config(state="disabled")
+
+        self.root.after(self.interval_ms, self._drain)
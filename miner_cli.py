@@ -0,0 +1,210 @@
+"""
+Headless command-line entry point for unattended runs (Task Scheduler, cron wrappers).
+
+    python -m miner_cli --contract "MNQ 03-26" --depth 4 --mode deep --stop-loss 5
+    python -m miner_cli --job ES:4 --job NQ:2 --job "CL 03-26:6:single"
+    python -m miner_cli --contract ES --plan-only
+    python -m miner_cli --job ES --job NQ --mode topup
+    python -m miner_cli --contract ES --priority recent --needs needs.txt
+
+Never imports Tk or PIL; the pywinauto backend is only imported once a
+run actually needs NinjaTrader. Progress goes to stderr, and a JSON
+summary is printed to stdout on exit.
+Exit codes: 0 ok, 1 error, 2 bad arguments, 3 stopped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from batch_queue import BatchJob, BatchQueue, BatchRunner, JOB_DONE
+from mining_engine import MiningEngine
+from mining_events import EventBus, LogMessage
+from mining_plan import describe_plan, plan_size
+from profiling import PROFILE_MODES
+from work_priority import PRIORITY_POLICIES
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_STOPPED = 3
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="miner_cli", description="NT8 Deep History Miner (headless)")
+    parser.add_argument("--contract", help="Starting contract ('MNQ 03-26') or root symbol ('MNQ' = front month)")
+    parser.add_argument("--job", action="append", default=[], metavar="SPEC",
+                        help="Batch job 'CONTRACT[:DEPTH[:MODE]]'. Repeat to queue several.")
+    parser.add_argument("--depth", type=int, default=4, help="Contracts back (default 4)")
+    parser.add_argument("--mode", choices=("deep", "single", "topup"), default="deep",
+                        help="topup: only the sessions after the newest file on disk (nightly refresh)")
+    parser.add_argument("--front-month", action="store_true",
+                        help="Give each session to one contract only: the front month by volume roll")
+    parser.add_argument("--roll-offset", type=int, help="Roll this many days before expiry (default: per product)")
+    parser.add_argument("--overlap", type=int, help="With --front-month, also take N days before each roll")
+    parser.add_argument("--priority", choices=PRIORITY_POLICIES,
+                        help="Work order: 'chain' (newest first per contract) or 'recent' (recent sessions first)")
+    parser.add_argument("--recent-days", type=int, help="Calendar days before the newest date that count as recent (default 10)")
+    parser.add_argument("--needs", metavar="FILE",
+                        help="Needed ranges ('ES 03-26 2025-12-01 2025-12-19' per line), mined first; re-read live")
+    parser.add_argument("--search", choices=("walk", "boundary"), default="walk",
+                        help="walk: newest first until --stop-loss misses; boundary: gallop + narrow down, sparse hole check")
+    parser.add_argument("--stop-loss", type=int, default=5, help="Stop after X consecutive 'No Data' dates (default 5)")
+    parser.add_argument("--replay-root", help="Override the db/replay folder")
+    parser.add_argument("--ledger", help="Run ledger path ('' disables the ledger)")
+    parser.add_argument("--stall-timeout", type=float,
+                        help="Abort a download after this many seconds without new bytes (default 60)")
+    parser.add_argument("--retry-scope", choices=("contract", "run"),
+                        help="Retry transient failures at the end of each contract (default) or of the run")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the .nrd files on disk first and download suspect ones again")
+    parser.add_argument("--hash", action="store_true", help="With --verify, also record SHA-256 hashes")
+    parser.add_argument("--no-adaptive", action="store_true", help="Use the fixed waits instead of adaptive timing")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Profile each run (cProfile .prof or span JSON in ~/.nt8_replay_miner/profiles)")
+    parser.add_argument("--single-window", action="store_true",
+                        help="Drive only the first Historical Data window, even if several are open")
+    parser.add_argument("--plan-only", action="store_true", help="Print the gap plan and exit without automating")
+    parser.add_argument("--quiet", action="store_true", help="No progress on stderr, only the JSON summary")
+    return parser
+
+
+def build_jobs(args):
+    defaults = dict(depth=args.depth, mode=args.mode, search_mode=args.search, stop_loss_limit=args.stop_loss)
+    specs = list(args.job)
+    if args.contract:
+        specs.insert(0, args.contract)
+    return [BatchJob.from_spec(spec, **defaults) for spec in specs]
+
+
+def config_overrides(args):
+    overrides = {}
+    if args.replay_root:
+        overrides["replay_root"] = args.replay_root
+    if args.ledger is not None:
+        overrides["ledger_path"] = args.ledger
+    if args.stall_timeout:
+        overrides["stall_timeout"] = args.stall_timeout
+    if args.retry_scope:
+        overrides["retry_scope"] = args.retry_scope
+    if args.verify:
+        overrides["verify_files"] = True
+        overrides["verify_hashes"] = args.hash
+    if args.front_month:
+        overrides["front_month_only"] = True
+        overrides["roll_overlap_days"] = args.overlap or 0
+    if args.roll_offset is not None:
+        overrides["roll_offset"] = args.roll_offset
+    if args.priority:
+        overrides["priority"] = args.priority
+    if args.recent_days:
+        overrides["recent_days"] = args.recent_days
+    if args.needs:
+        overrides["needs_path"] = os.path.abspath(args.needs)
+    if args.no_adaptive:
+        overrides["adaptive_timing"] = False
+    if args.profile:
+        overrides["profile"] = args.profile
+    return overrides
+
+
+def print_plans(jobs, args, emit):
+    total = 0
+    for job in jobs:
+        config = job.to_config(**config_overrides(args))
+        plan = MiningEngine(config, driver=None).plan()
+        for line in describe_plan(plan, config.est_seconds_per_date):
+            emit(line)
+        total += plan_size(plan)
+    return {"status": "ok", "planned": total, "jobs": [job.contract for job in jobs]}
+
+
+def main(argv=None):
+    started = time.monotonic()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.overlap is not None and not args.front_month:
+        parser.error("--overlap only applies with --front-month")
+    if args.search == "boundary" and (args.priority == "recent" or args.needs):
+        parser.error("--search boundary searches whole contracts; it can't be combined with --priority recent or --needs")
+
+    def emit(text):
+        if not args.quiet:
+            print(text, file=sys.stderr, flush=True)
+
+    try:
+        jobs = build_jobs(args)
+    except ValueError as e:
+        print(json.dumps({"status": "error", "error": str(e)}))
+        return EXIT_USAGE
+    if not jobs:
+        print(json.dumps({"status": "error", "error": "Give --contract or at least one --job"}))
+        return EXIT_USAGE
+
+    if args.plan_only:
+        summary = print_plans(jobs, args, emit)
+        summary["elapsed"] = round(time.monotonic() - started, 3)
+        print(json.dumps(summary))
+        return EXIT_OK
+
+    # Only now pull in pywinauto / Win32
+    try:
+        from nt8_driver import NT8WindowDriver, create_window_drivers
+    except ImportError as e:
+        print(json.dumps({"status": "error", "error": f"Automation backend unavailable: {e}"}))
+        return EXIT_ERROR
+
+    events = EventBus()
+    events.subscribe(lambda e: emit(e.text), [LogMessage])
+    queue = BatchQueue()
+    for job in jobs:
+        queue.add(job)
+
+    runner = None
+    stopped = False
+    error = None
+    try:
+        drivers = [NT8WindowDriver()] if args.single_window else create_window_drivers()
+        if len(drivers) > 1:
+            emit(f"Found {len(drivers)} Historical Data windows")
+        runner = BatchRunner(queue, drivers, events=events, config_overrides=config_overrides(args))
+        runner.run()
+    except KeyboardInterrupt:
+        if runner:
+            runner.stop()
+        stopped = True
+    except Exception as e:
+        # Window closed, date field misbehaving, ...: still report in JSON
+        error = str(e) or type(e).__name__
+        emit(f"ERROR: {error}")
+
+    results = []
+    for job in queue.jobs():
+        summary = job.summary or {}
+        error = error or summary.get("error")
+        stopped = stopped or summary.get("stopped", False)
+        results.append({"contract": job.contract, "status": job.status,
+                        "downloaded": summary.get("downloaded", 0),
+                        "profile_file": summary.get("profile_file"),
+                        "contracts": summary.get("contracts", [])})
+
+    if error:
+        status, code = "error", EXIT_ERROR
+    elif stopped or any(job.status != JOB_DONE for job in queue.jobs()):
+        status, code = "stopped", EXIT_STOPPED
+    else:
+        status, code = "ok", EXIT_OK
+
+    print(json.dumps({
+        "status": status,
+        "error": error,
+        "downloaded": sum(r["downloaded"] for r in results),
+        "jobs": results,
+        "elapsed": round(time.monotonic() - started, 3),
+    }))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,735 @@
+"""
+Headless mining engine for the NT8 Deep History Miner.
+
+The engine owns the deep-history date loop. It never touches Tk or
+pywinauto directly: everything it needs from NinjaTrader goes through a
+ReplayDriver, so the same loop runs under the GUI, a CLI or a fake driver.
+"""
+import os
+import time
+from contextlib import nullcontext
+
+from adaptive_timing import AdaptiveTiming
+from mining_events import (EventBus, LogMessage, Progress, DateStarted, DateOutcome,
+                           ContractFinished, RunStats)
+from mining_plan import build_plan, describe_plan, plan_size
+from profiling import create_profiler, get_profile_mode, get_default_profile_dir
+from replay_index import ReplayIndex
+from replay_verify import verify_contract, set_aside, get_default_manifest_dir
+from retry_queue import RetryQueue
+from transfer_monitor import TransferMonitor
+from run_metrics import RunMetrics, get_default_metrics_dir
+from run_ledger import (RunLedger, get_default_ledger_path, RESULT_DOWNLOADED, RESULT_NO_DATA,
+                        RESULT_ERROR_LATE, RESULT_NO_REACTION, RESULT_STALLED, RESULT_DATE_FAILED)
+
+# Driver states returned by ReplayDriver.poll_state()
+STATE_READY = "ready"      # Download button enabled
+STATE_BUSY = "busy"        # Download button disabled (download running)
+STATE_POPUP = "popup"      # An error popup owns the foreground
+
+# Per-date outcomes
+OUTCOME_STARTED = "started"
+OUTCOME_ERROR = "error"
+OUTCOME_ERROR_LATE = "error_late"
+OUTCOME_UNKNOWN = "unknown"
+OUTCOME_STALLED = "stalled"  # Download started, but no bytes for stall_timeout or no file when it ended
+OUTCOME_DATE_FAILED = "date_failed"  # The driver could not type the date (field glitch, window gone)
+
+# Failures that say nothing about whether the date has data: retried later, never a stop-loss miss
+TRANSIENT_OUTCOMES = (OUTCOME_UNKNOWN, OUTCOME_ERROR_LATE, OUTCOME_STALLED, OUTCOME_DATE_FAILED)
+
+# What attempt_date() concluded about a date
+ATTEMPT_HIT = "hit"              # File landed
+ATTEMPT_NO_DATA = "no_data"      # Confirmed "No Data" popup
+ATTEMPT_TRANSIENT = "transient"  # Unknown for now, worth a retry
+
+# How each failed outcome is written to the run ledger
+LEDGER_RESULTS = {
+    OUTCOME_ERROR: RESULT_NO_DATA,
+    OUTCOME_ERROR_LATE: RESULT_ERROR_LATE,
+    OUTCOME_UNKNOWN: RESULT_NO_REACTION,
+    OUTCOME_STALLED: RESULT_STALLED,
+    OUTCOME_DATE_FAILED: RESULT_DATE_FAILED,
+}
+
+
+def get_replay_root():
+    """Default NinjaTrader 8 market replay folder (My Documents\\NinjaTrader 8\\db\\replay)."""
+    docs_path = os.path.join(os.path.expanduser("~"), "Documents")
+    return os.path.join(docs_path, "NinjaTrader 8", "db", "replay")
+
+
+def replay_filename(day):
+    """Returns the .nrd file name NinjaTrader uses for a session date (e.g. 20260116.nrd)."""
+    return f"{day.year}{day.month:02d}{day.day:02d}.nrd"
+
+
+class MiningConfig:
+    """Settings for one mining run. Defaults match the v2 GUI."""
+
+    def __init__(self, start_contract, max_contracts_back=4, stop_loss_limit=5,
+                 mode="deep", replay_root=None, start_date=None,
+                 search_mode="walk", ledger_path=None):
+        self.start_contract = start_contract.strip()
+        self.max_contracts_back = max_contracts_back
+        self.stop_loss_limit = stop_loss_limit
+        # "deep": the chain max_contracts_back deep, "single": start_contract only,
+        # "topup": only sessions after the newest file on disk, under the current front month
+        self.mode = mode
+        # "walk": newest first until stop_loss_limit misses
+        # "boundary": gallop + bisect for the start of history, then fill
+        self.search_mode = search_mode
+        # Front-month-only: each contract covers only the sessions it was front
+        # month (previous roll -> own roll), so neighbouring contracts never
+        # download the same days. roll_offset (days before expiry) defaults to
+        # the product spec; roll_overlap_days adds back that many days before each roll.
+        self.front_month_only = False
+        self.roll_offset = None
+        self.roll_overlap_days = 0
+        # Work order (work_priority): "chain" walks newest first per contract,
+        # "recent" first takes the sessions within recent_days calendar days of
+        # the newest date. Dates in needs_path (re-read when it changes) go ahead of both.
+        self.priority = "chain"
+        self.recent_days = 10
+        self.needs_path = None
+        # SQLite ledger of every attempt ("" disables it)
+        self.ledger_path = get_default_ledger_path() if ledger_path is None else ledger_path
+        self.no_data_ttl_days = 7  # Don't retry a "No Data" date for this long
+        # ... unless the answer came within this many days of the session (maybe not published yet)
+        self.no_data_settle_days = 3
+        # Per-run phase timings are exported here as JSON + CSV ("" disables export)
+        self.metrics_dir = get_default_metrics_dir()
+        # Opt-in profiling: None, "cprofile" or "spans" (default from NT8_MINER_PROFILE)
+        self.profile = get_profile_mode()
+        self.profile_dir = get_default_profile_dir()
+        self.replay_root = replay_root or get_replay_root()
+        # Check the files on disk before planning; suspect ones are downloaded again
+        self.verify_files = False
+        self.verify_hashes = False     # Also record SHA-256 hashes in the manifest
+        self.verify_workers = 4
+        self.manifest_dir = get_default_manifest_dir()
+        # Newest date to plan for (default: yesterday)
+        self.start_date = start_date
+
+        # Timings (seconds). With adaptive_timing the outcome window and the polls
+        # are upper bounds the engine shrinks towards the latencies it observes.
+        self.adaptive_timing = True
+        self.settle_delay = 0.5        # After typing the instrument
+        self.ready_timeout = 5.0       # Waiting for the button before clicking
+        self.ready_poll = 0.5
+        self.outcome_timeout = 3.0     # Waiting for the app to react to the click
+        self.outcome_poll = 0.1
+        self.stall_timeout = 60.0      # Abort once no new bytes arrived for this long (counted from the click)
+        # Transient failures (no reaction, late popup, stall) are retried with
+        # exponential backoff at the end of each contract ("contract") or of the run ("run")
+        self.retry_scope = "contract"
+        self.retry_attempts = 3        # Attempts per date, including the first
+        self.retry_base_delay = 5.0
+        self.retry_max_delay = 60.0
+        self.transient_limit = 10      # Consecutive transient failures before moving on from a contract
+        self.download_poll = 0.5
+        self.throttle = 1.0            # Pause after each successful download
+        self.recheck_delay = 0.5       # Before re-checking disk after no reaction
+        self.est_seconds_per_date = 6.0  # Plan ETA: click + download + throttle
+
+
+class ReplayDriver:
+    """
+    Interface between the engine and the NinjaTrader Historical Data window.
+    Implementations: NT8WindowDriver (pywinauto) or any fake for testing.
+    """
+
+    def connect(self):
+        """Locate the window and its controls. Returns None on success or an error message."""
+        raise NotImplementedError
+
+    def set_instrument(self, contract):
+        raise NotImplementedError
+
+    def set_date(self, day):
+        raise NotImplementedError
+
+    def click_download(self):
+        raise NotImplementedError
+
+    def poll_state(self):
+        """Returns one of STATE_READY, STATE_BUSY or STATE_POPUP. Must not block."""
+        raise NotImplementedError
+
+    def dismiss_popup(self):
+        """Closes the foreground error popup. Returns its title, or None if nothing was dismissed."""
+        raise NotImplementedError
+
+    def cancel_download(self):
+        """Aborts a running download. Returns True if the driver could cancel it (optional)."""
+        return False
+
+
+def run_instrumented(config, engines, events, run):
+    """
+    Runs run(profiler) -> summary under the configured profiler (every engine
+    instrumented), then logs and exports the engines' phase metrics merged into
+    one run and publishes RunStats. Shared by MiningEngine and ParallelMiner.
+    """
+    def log(text):
+        events.publish(LogMessage(text))
+
+    try:
+        profiler = create_profiler(config.profile, config.profile_dir)
+    except ValueError as e:
+        log(f"Profiling off: {e}")
+        profiler = None
+    if profiler:
+        for engine in engines:
+            profiler.start(engine)
+    try:
+        summary = run(profiler)
+    finally:
+        if profiler:
+            try:
+                profile_path = profiler.stop()
+                log(f"Profile: {profile_path}")
+            except OSError as e:
+                profile_path = None
+                log(f"Could not write profile: {e}")
+    if profiler:
+        summary["profile_file"] = profile_path
+
+    metrics = engines[0].metrics if len(engines) == 1 else RunMetrics.merged(e.metrics for e in engines)
+    summary["timings"] = metrics.summary()
+    for line in metrics.describe():
+        log(line)
+    if config.metrics_dir and metrics.rows:
+        try:
+            summary["metrics_files"] = metrics.export(config.metrics_dir)
+            log(f"Metrics: {summary['metrics_files'][0]}")
+        except OSError as e:
+            log(f"Could not write metrics: {e}")
+    events.publish(RunStats(summary))
+    return summary
+
+
+class MiningEngine:
+    def __init__(self, config, driver, log=None, progress=None, events=None, index=None, ledger=None, ui_lock=None):
+        """
+        log(text) and progress(text) are shortcuts that subscribe plain callbacks
+        to the LogMessage and Progress events on the bus.
+        index, ledger and ui_lock are shared by the engines of a window pool
+        (see parallel_miner); ui_lock serialises the foreground-sensitive
+        part of each date (typing, clicking, reading the reaction).
+        """
+        self.config = config
+        self.driver = driver
+        self.events = events or EventBus()
+        if log:
+            self.events.subscribe(lambda e: log(e.text), [LogMessage])
+        if progress:
+            self.events.subscribe(lambda e: progress(e.text), [Progress])
+        self.current_contract = None
+        self.stop_requested = False
+        self.index = index or ReplayIndex(config.replay_root)
+        self.timing = AdaptiveTiming(config, enabled=config.adaptive_timing)
+        self.metrics = RunMetrics()
+        self.retries = RetryQueue(config.retry_base_delay, config.retry_max_delay, config.retry_attempts)
+        if ledger is None and config.ledger_path:
+            ledger = RunLedger(config.ledger_path)
+        self.ledger = ledger
+        self.ui_lock = ui_lock
+        self.existing_dates = set()
+        self.downloaded_count = 0
+
+    def stop(self):
+        self.stop_requested = True
+
+    def log(self, text):
+        self.events.publish(LogMessage(text))
+
+    def progress(self, text):
+        self.events.publish(Progress(self.current_contract, self.downloaded_count, text))
+
+    def plan(self):
+        """Computes the gap plan for the configured chain without touching the UI."""
+        plan = build_plan(self.config, self.index, self.ledger)
+        if self.config.verify_files and self.verify(plan):
+            plan = build_plan(self.config, self.index, self.ledger)
+        return plan
+
+    def verify(self, plan):
+        """
+        Checks the .nrd files of every contract in the plan, moves the suspect
+        ones aside (.nrd.bad) and drops them from the index so the next plan
+        re-queues them. A file that can't be moved stays in the index: the
+        re-download could not be told apart from it.
+        Returns the number of suspect files.
+        """
+        cfg = self.config
+        suspect_count = 0
+        for contract_plan in plan:
+            contract = contract_plan.contract
+            folder = self.index.contract_dir(contract)
+            suspect = verify_contract(folder, contract, cfg.manifest_dir, cfg.verify_hashes, cfg.verify_workers)
+            for day, reason in sorted(suspect.items()):
+                try:
+                    set_aside(folder, day)
+                except OSError as e:
+                    self.log(f"  ⚠ {contract} {day}: {reason} file, could not move it aside ({e})")
+                    continue
+                self.log(f"  ⚠ {contract} {day}: {reason} file, moved aside and re-queued")
+                self.index.discard(contract, day)
+            suspect_count += len(suspect)
+        self.log(f"Verified {len(plan)} contracts: {suspect_count} suspect files")
+        return suspect_count
+
+    def run(self):
+        """Plans the full mine, then downloads only the missing dates. Returns a summary dict."""
+        return run_instrumented(self.config, [self], self.events, lambda profiler: self._run())
+
+    def _run(self):
+        cfg = self.config
+        summary = {"contracts": [], "downloaded": 0, "stopped": False, "error": None}
+
+        self.log(f"\n{'='*50}")
+        self.log("⚡ STARTING DEEP HISTORY MINE (V2 AUTO) ⚡")
+
+        plan = self.plan()
+        for line in describe_plan(plan, cfg.est_seconds_per_date):
+            self.log(line)
+        if not plan_size(plan):
+            self.log("Nothing to download. The archive is up to date.")
+
+        for contract_plan in plan:
+            if self.stop_requested:
+                break
+            if not contract_plan.missing:
+                continue
+
+            self.log(f"\n>>> PROCESSING CONTRACT: {contract_plan.contract}")
+
+            with self.metrics.phase("find_controls"):
+                error = self.driver.connect()
+            if error:
+                self.log(f"ERROR: {error}")
+                summary["error"] = error
+                break
+
+            downloaded_count = self.mine_contract(contract_plan)
+            summary["contracts"].append({"contract": contract_plan.contract, "downloaded": downloaded_count})
+            summary["downloaded"] += downloaded_count
+
+        if self.retries and not summary["error"]:
+            summary["downloaded"] += self.retry_deferred()
+        summary["retries_left"] = len(self.retries)
+        summary["stopped"] = self.stop_requested
+        self.log("\n✓ MINING COMPLETE")
+        return summary
+
+    def mine_contract(self, contract_plan):
+        """Mines one contract's missing dates with the configured search mode. Returns the download count."""
+        cfg = self.config
+        contract = contract_plan.contract
+        self.select_contract(contract)
+        self.downloaded_count = 0
+
+        if cfg.search_mode == "boundary":
+            self.search_contract(contract_plan)
+        else:
+            self.walk_contract(contract_plan)
+        if cfg.retry_scope == "contract":
+            self.retry_deferred(contract)
+
+        self.log(f"Finished {contract}. Downloaded: {self.downloaded_count}")
+        self.log(self.timing.describe())
+        self.events.publish(ContractFinished(contract, self.downloaded_count))
+        return self.downloaded_count
+
+    def select_contract(self, contract):
+        self.current_contract = contract
+        self.log(f"Setting Instrument: {contract}")
+        with self.ui_lock or nullcontext(), self.metrics.phase("set_instrument"):
+            self.driver.set_instrument(contract)
+            time.sleep(self.config.settle_delay)
+        self.existing_dates = self.index.dates(contract)
+
+    def defer(self, contract, day, attempts=1):
+        """Parks a transiently failed date in the retry queue."""
+        delay = self.retries.defer(contract, day, attempts)
+        if delay is None:
+            self.log(f"  Giving up on {day} after {attempts} attempts")
+        else:
+            self.log(f"  ↺ Deferred, retry in {delay:.0f}s")
+
+    def retry_deferred(self, contract=None):
+        """
+        Re-attempts the deferred dates (of contract, or all of them), waiting out
+        each one's backoff. Dates that fail transiently again are deferred again
+        until retry_attempts is used up. Returns the number of files that landed.
+        """
+        landed = 0
+        if not self.retries.pending(contract):
+            return landed
+        self.log(f"\n>>> RETRYING {self.retries.pending(contract)} DEFERRED DATES")
+        while not self.stop_requested:
+            item = self.retries.pop(contract)
+            if item is None:
+                break
+            self._sleep(item.due - time.monotonic())
+            if self.stop_requested:
+                self.retries.defer(item.contract, item.day, item.attempts)
+                break
+            if item.contract != self.current_contract:
+                self.select_contract(item.contract)
+            result = self.attempt_date(item.contract, item.day)
+            if result == ATTEMPT_HIT:
+                landed += 1
+            elif result == ATTEMPT_TRANSIENT:
+                self.defer(item.contract, item.day, item.attempts + 1)
+        return landed
+
+    def _sleep(self, seconds):
+        """Sleeps in short steps so stop() is honoured during long backoffs."""
+        end = time.monotonic() + seconds
+        while not self.stop_requested and time.monotonic() < end:
+            time.sleep(min(0.25, end - time.monotonic()))
+
+    def walk_contract(self, contract_plan):
+        """
+        Downloads the missing dates newest first. Gives up on the contract after
+        stop_loss_limit consecutive "No Data" misses, i.e. once its history has run out.
+        Dates the ledger already knows as "No Data" count as misses without an attempt.
+        Transient failures are deferred and don't touch the streak.
+        """
+        dates = contract_plan.missing
+        consecutive_misses = 0
+        consecutive_transient = 0
+
+        self.log(f"Mining {len(dates)} missing dates from: {dates[0]}")
+
+        for current_date in contract_plan.sessions:
+            if consecutive_misses >= self.config.stop_loss_limit or self.stop_requested:
+                break
+            if current_date in self.existing_dates:
+                continue
+
+            if current_date in contract_plan.no_data:
+                consecutive_misses += 1
+                continue
+
+            result = self.attempt_date(contract_plan.contract, current_date)
+            if result == ATTEMPT_TRANSIENT:
+                self.defer(contract_plan.contract, current_date)
+                consecutive_transient += 1
+                if consecutive_transient >= self.config.transient_limit:
+                    self.log(f"  No usable reaction for {consecutive_transient} dates in a row. Moving on.")
+                    break
+            else:
+                consecutive_transient = 0
+                consecutive_misses = 0 if result == ATTEMPT_HIT else consecutive_misses + 1
+
+            self.progress(f"Total: {self.downloaded_count} | Streak: {consecutive_misses}")
+
+    def search_contract(self, contract_plan):
+        """
+        Finds where the contract's available history starts by galloping back
+        from the newest session (steps 1, 2, 4, ...), then narrowing down the
+        range between the last hit and the first miss. A miss only ends the
+        search when the session stop_loss_limit-1 further back has no data
+        either: one sparse probe instead of the walk's stop_loss_limit misses.
+        A shorter data hole is stepped over and the search goes on below it.
+        Only the confirmed range is filled in.
+        Probes that hit are downloads the fill needs anyway, so the cost of the
+        search is its misses: the split point sits a quarter of the way from
+        the last hit rather than halfway. Dates already on disk count as free
+        hits. Probes need a definite answer, so a transient failure is retried
+        in place with backoff.
+        """
+        contract = contract_plan.contract
+        sessions = contract_plan.sessions  # Newest first
+        probed = {}
+
+        def has_data(i):
+            day = sessions[i]
+            if day in self.existing_dates:
+                return True
+            if day in contract_plan.no_data:
+                return False
+            if i not in probed:
+                probed[i] = self._probe(contract, day) == ATTEMPT_HIT
+                self.progress(f"Total: {self.downloaded_count} | Probes: {len(probed)}")
+            return probed[i]
+
+        def data_below(i):
+            """Index stop_loss_limit-1 sessions back from the miss at i if it has data, else None."""
+            j = min(i + self.config.stop_loss_limit - 1, len(sessions) - 1)
+            return j if j > i and has_data(j) else None
+
+        if not sessions:
+            return
+        # 1. Data near the newest session (the latest days may not be published yet)
+        lo = 0 if has_data(0) else data_below(0)
+        if lo is None:
+            if not self.stop_requested:
+                self.log("  No data near the newest session. Skipping contract.")
+            return
+
+        while not self.stop_requested:
+            # 2. Gallop back until the first miss
+            hi, step = len(sessions), 1
+            while lo < len(sessions) - 1 and not self.stop_requested:
+                i = min(lo + step, len(sessions) - 1)
+                if has_data(i):
+                    lo = i
+                    step *= 2
+                else:
+                    hi = i
+                    break
+
+            # 3. Narrow down between the last hit (lo) and the first miss (hi)
+            while hi - lo > 1 and not self.stop_requested:
+                mid = lo + max(1, (hi - lo) // 4)
+                if has_data(mid):
+                    lo = mid
+                else:
+                    hi = mid
+
+            # 4. The start of history, unless the sparse probe below the miss finds data (a hole)
+            if hi >= len(sessions) or self.stop_requested:
+                break
+            resume = data_below(hi)
+            if resume is None:
+                break
+            self.log(f"  Data hole at {sessions[hi]}, history goes on at {sessions[resume]}")
+            lo = resume
+
+        if self.stop_requested:
+            return
+        self.log(f"  History starts at {sessions[lo]} ({len(probed)} probes). Filling {sessions[0]} → {sessions[lo]}")
+
+        # 5. Fill in the confirmed range
+        for i in range(lo + 1):
+            if self.stop_requested:
+                break
+            if sessions[i] in self.existing_dates or sessions[i] in contract_plan.no_data:
+                continue
+            if i not in probed:
+                if self.attempt_date(contract, sessions[i]) == ATTEMPT_TRANSIENT:
+                    self.defer(contract, sessions[i])
+                self.progress(f"Total: {self.downloaded_count} | Filling: {i + 1}/{lo + 1}")
+
+    def _probe(self, contract, day):
+        """attempt_date(), retrying transient failures in place (up to retry_attempts). Returns the last result."""
+        result = self.attempt_date(contract, day)
+        attempts = 1
+        while result == ATTEMPT_TRANSIENT and attempts < self.config.retry_attempts and not self.stop_requested:
+            self._sleep(self.retries.delay(attempts))
+            attempts += 1
+            result = self.attempt_date(contract, day)
+        return result
+
+    def attempt_date(self, contract, day):
+        """
+        Types the date, downloads it and records the result.
+        Returns ATTEMPT_HIT, ATTEMPT_NO_DATA or ATTEMPT_TRANSIENT.
+        """
+        self.log(f"Checking {day.strftime('%m/%d/%Y')}...")
+        self.events.publish(DateStarted(contract, day))
+        self.metrics.begin_date(contract, day)
+        started = time.monotonic()
+
+        outcome, monitor = self.download_date(contract, day)
+        landed = False
+
+        # A file only counts when this attempt wrote it: an older partial one may be in its place
+        if outcome == OUTCOME_STARTED and not monitor.landed():
+            self.log("  ✗ Download ended but no file on disk")
+            outcome = OUTCOME_STALLED
+        elif outcome == OUTCOME_STARTED:
+            self.log("  ✓ SUCCESS")
+            self._record_download(contract, day, started)
+            landed = True
+        if outcome == OUTCOME_STALLED:
+            self.log("  ✗ Download stalled")
+            self._set_aside_partial(contract, day, monitor)
+        elif outcome == OUTCOME_UNKNOWN:
+            self.log("  ? No reaction from button/app.")
+            # Could be instant download? Check file
+            time.sleep(self.config.recheck_delay)
+            if monitor.landed():
+                self.log("  (File found despite no UI reaction)")
+                self._record_download(contract, day, started)
+                landed = True
+
+        if not landed:
+            self._record_ledger(contract, day, LEDGER_RESULTS[outcome], started)
+        self.events.publish(DateOutcome(contract, day, outcome, landed, time.monotonic() - started))
+
+        if outcome == OUTCOME_STARTED:
+            with self.metrics.phase("throttle"):
+                time.sleep(self.config.throttle)
+        self.metrics.end_date(outcome, landed)
+        if landed:
+            return ATTEMPT_HIT
+        return ATTEMPT_TRANSIENT if outcome in TRANSIENT_OUTCOMES else ATTEMPT_NO_DATA
+
+    def _set_aside_partial(self, contract, day, monitor):
+        """Moves a partly written .nrd aside so the next plan doesn't take the day as done."""
+        if not monitor.bytes or replay_filename(day) not in monitor.sizes:
+            return
+        try:
+            set_aside(self.index.contract_dir(contract), day)
+        except OSError as e:
+            self.log(f"  Could not move the partial file aside: {e}")
+
+    def _record_download(self, contract, day, started):
+        self.index.add(contract, day)
+        self.downloaded_count += 1
+        self._record_ledger(contract, day, RESULT_DOWNLOADED, started)
+
+    def _record_ledger(self, contract, day, result, started):
+        if self.ledger:
+            self.ledger.record(contract, day, result, time.monotonic() - started)
+
+    def download_date(self, contract, day):
+        """
+        Types the date, clicks Download, classifies the reaction and waits for the file.
+        Returns (outcome, TransferMonitor of the date's file or None if nothing was clicked),
+        the outcome one of OUTCOME_STARTED, OUTCOME_ERROR, OUTCOME_ERROR_LATE, OUTCOME_STALLED,
+        OUTCOME_UNKNOWN or OUTCOME_DATE_FAILED.
+        """
+        with self.ui_lock or nullcontext():
+            outcome, monitor = self._start_download(contract, day)
+        if outcome != OUTCOME_STARTED:
+            return outcome, monitor
+        return self._wait_download(monitor), monitor
+
+    def _start_download(self, contract, day):
+        """Steps 1-3: up to the app's reaction to the click. Returns (outcome, TransferMonitor)."""
+        cfg = self.config
+        timing = self.timing
+
+        with self.metrics.phase("set_date"):
+            try:
+                self.driver.set_date(day)
+            except Exception as e:
+                self.log(f"  Date Exception: {e}")
+                return OUTCOME_DATE_FAILED, None
+
+        # 1. Wait until button is enabled
+        phase_start = time.monotonic()
+        wait_ready = 0
+        state = self.driver.poll_state()
+        while state != STATE_READY and wait_ready < cfg.ready_timeout:
+            # A previous popup may have lingered
+            if state == STATE_POPUP and self._dismiss_popup():
+                self.log("  (Cleared lingering popup)")
+            time.sleep(timing.ready_poll)
+            wait_ready += timing.ready_poll
+            state = self.driver.poll_state()
+        if state != STATE_READY:
+            timing.record_error()
+        self.metrics.add("wait_enabled", time.monotonic() - phase_start)
+
+        # 2. Click Download
+        monitor = TransferMonitor(self.index.contract_dir(contract), replay_filename(day))
+        phase_start = time.monotonic()
+        try:
+            self.driver.click_download()
+        except Exception as e:
+            self.log(f"Click Exception: {e}")
+        clicked_at = time.monotonic()
+        self.metrics.add("click", clicked_at - phase_start)
+
+        # 3. POLL FOR OUTCOME (Critical Phase)
+        # A) Button disables (download started) -> good
+        # B) Error popup appears (No Data) -> miss
+        # C) Nothing happens (timeout) -> miss
+        outcome = OUTCOME_UNKNOWN
+        outcome_timeout = timing.outcome_timeout
+        while time.monotonic() - clicked_at < outcome_timeout:
+            state = self.driver.poll_state()
+            if state == STATE_POPUP:
+                timing.record_reaction(time.monotonic() - clicked_at)
+                self._dismiss_popup()
+                outcome = OUTCOME_ERROR
+                break
+            if state == STATE_BUSY:
+                timing.record_reaction(time.monotonic() - clicked_at)
+                outcome = OUTCOME_STARTED
+                break
+            time.sleep(cfg.outcome_poll)
+        self.metrics.add("detect_outcome", time.monotonic() - clicked_at)
+
+        if outcome == OUTCOME_UNKNOWN:
+            timing.record_error()
+        return outcome, monitor
+
+    def _wait_download(self, monitor):
+        cfg = self.config
+        timing = self.timing
+
+        # 4. Wait for download to finish (button becomes enabled again).
+        # Only a stall ends the wait: no new bytes for stall_timeout, counted
+        # from the click until the first byte. Large healthy days may run long.
+        started_at = time.monotonic()
+        while not self.stop_requested:
+            state = self.driver.poll_state()
+            monitor.sample()
+            if state == STATE_READY:
+                timing.record_completion(time.monotonic() - started_at)
+                if monitor.bytes:
+                    self.log(f"  ↓ {monitor.describe()}")
+                break
+            # Just in case an error pops up LATE (weird, but possible)
+            if state == STATE_POPUP and self._dismiss_late_popup():
+                timing.record_error()
+                self.metrics.add("download", time.monotonic() - started_at)
+                return OUTCOME_ERROR_LATE
+            if monitor.stalled(cfg.stall_timeout):
+                if monitor.bytes:
+                    self.log(f"  No new bytes for {cfg.stall_timeout:g}s after {monitor.describe()}. Aborting.")
+                else:
+                    self.log(f"  Nothing written {cfg.stall_timeout:g}s after the click. Aborting.")
+                timing.record_error()
+                self._abort_download()
+                self.metrics.add("download", time.monotonic() - started_at)
+                return OUTCOME_STALLED
+            time.sleep(timing.download_poll)
+
+        self.metrics.add("download", time.monotonic() - started_at)
+        return OUTCOME_STARTED
+
+    def _dismiss_late_popup(self):
+        """
+        Dismisses a popup seen while waiting for a download. In a window pool
+        another window may be mid-click with its own popup in front, so the
+        popup is only taken as ours when the UI lock is free.
+        """
+        if self.ui_lock is None:
+            self._dismiss_popup()
+            return True
+        if not self.ui_lock.acquire(blocking=False):
+            return False
+        try:
+            if self.driver.poll_state() != STATE_POPUP:
+                return False
+            self._dismiss_popup()
+            return True
+        finally:
+            self.ui_lock.release()
+
+    def _abort_download(self):
+        """Cancels the hung transfer if the driver can, then waits for the button to come back."""
+        try:
+            if self.driver.cancel_download():
+                self.log("  (Download cancelled)")
+        except Exception as e:
+            self.log(f"  Cancel Exception: {e}")
+        waited = 0
+        while self.driver.poll_state() != STATE_READY and waited < self.config.ready_timeout:
+            time.sleep(self.timing.ready_poll)
+            waited += self.timing.ready_poll
+
+    def _dismiss_popup(self):
+        title = self.driver.dismiss_popup()
+        if title:
+            self.log(f"  ⚠ Active Popup detected: '{title}'. DISMISSING.")
+        return title
@@ -0,0 +1,72 @@
+"""
+Typed progress events published by the mining engine.
+
+The engine publishes to an EventBus from its worker thread. Subscribers
+(the GUI, a CLI printer, a metrics file) attach to the same bus. Anything
+that must run on another thread, like Tk, subscribes an EventQueue and
+drains it at its own pace.
+"""
+import queue
+import threading
+from collections import namedtuple
+
+LogMessage = namedtuple("LogMessage", ["text"])
+DateStarted = namedtuple("DateStarted", ["contract", "day"])
+DateOutcome = namedtuple("DateOutcome", ["contract", "day", "outcome", "landed", "duration"])
+Progress = namedtuple("Progress", ["contract", "downloaded", "text"])
+ContractFinished = namedtuple("ContractFinished", ["contract", "downloaded"])
+RunStats = namedtuple("RunStats", ["summary"])
+# Published by the owner of the worker thread when it exits (error is None on a clean exit)
+WorkerStopped = namedtuple("WorkerStopped", ["error", "details"])
+
+# Only the newest of these matters; older ones can be dropped when draining
+COALESCED_EVENTS = (Progress,)
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback, event_types=None):
+        """Calls callback(event) for every event, or only for the given types. Returns an unsubscribe token."""
+        entry = (callback, tuple(event_types) if event_types else None)
+        with self._lock:
+            self._subscribers.append(entry)
+        return entry
+
+    def unsubscribe(self, token):
+        with self._lock:
+            if token in self._subscribers:
+                self._subscribers.remove(token)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, event_types in subscribers:
+            if event_types is None or isinstance(event, event_types):
+                callback(event)
+
+
+class EventQueue:
+    """Thread-safe buffer to subscribe to a bus and drain from another thread."""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def __call__(self, event):
+        self._queue.put(event)
+
+    def drain(self, coalesce=COALESCED_EVENTS):
+        """Returns the pending events in order, keeping only the latest of each coalesced type."""
+        events = []
+        try:
+            while True:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        latest = {}
+        for i, event in enumerate(events):
+            if isinstance(event, coalesce):
+                latest[type(event)] = i
+        return [e for i, e in enumerate(events) if not isinstance(e, coalesce) or latest[type(e)] == i]
@@ -0,0 +1,155 @@
+"""
+Up-front gap planning.
+
+Before any automation starts, walk the contract chain, bound each contract
+by its active trading period and diff against the replay files on disk.
+The result is the exact, ordered list of dates the engine has to visit.
+"""
+from datetime import date, timedelta
+
+from contract_utils import (get_active_trading_period, get_front_contract, get_front_month_period,
+                            get_previous_contract, parse_nt8_contract)
+from trading_calendar import is_trading_day
+
+
+class ContractPlan:
+    """Session dates and the missing subset for one contract, newest first."""
+
+    def __init__(self, contract, start, end, sessions, missing, present, no_data=None):
+        self.contract = contract
+        self.start = start
+        self.end = end
+        self.sessions = sessions
+        self.missing = missing
+        self.present = present
+        self.no_data = no_data or set()  # Recently confirmed "No Data" (from the run ledger)
+
+    def __repr__(self):
+        return f"ContractPlan({self.contract!r}, missing={len(self.missing)}, present={self.present})"
+
+
+def get_contract_chain(start_contract, depth, mode="deep"):
+    """Returns [start_contract, previous, ...] going depth contracts back (just the first in single mode)."""
+    chain = [start_contract]
+    if mode == "single":
+        return chain
+    for _ in range(depth):
+        chain.append(get_previous_contract(chain[-1]))
+    return chain
+
+
+def session_dates(start, end, symbol):
+    """Session dates for symbol from end back to start (inclusive), newest first. Weekends and holidays are left out."""
+    days = []
+    current = end
+    while current >= start:
+        if is_trading_day(current, symbol):
+            days.append(current)
+        current -= timedelta(days=1)
+    return days
+
+
+def get_last_date(config):
+    """Newest session to plan for: config.start_date, or yesterday."""
+    return config.start_date or (date.today() - timedelta(days=1))
+
+
+def build_plan(config, index, ledger=None):
+    """
+    Returns a list of ContractPlan covering the whole chain, in mining order.
+    Dates the ledger saw return "No Data" within config.no_data_ttl_days are left out,
+    unless that answer came within config.no_data_settle_days of the session.
+    """
+    if config.mode == "topup":
+        return build_topup_plan(config, index)
+    last_date = get_last_date(config)
+    plan = []
+    for contract in get_contract_chain(config.start_contract, config.max_contracts_back, config.mode):
+        start, end = get_active_trading_period(contract, config.front_month_only, config.roll_offset)
+        if config.front_month_only:
+            start -= timedelta(days=config.roll_overlap_days)
+        end = min(end, last_date)
+        symbol = parse_nt8_contract(contract)[0]
+        candidates = session_dates(start, end, symbol)
+        existing = index.dates(contract)
+        no_data = (ledger.known_no_data(contract, config.no_data_ttl_days, config.no_data_settle_days)
+                   if ledger else set())
+        missing = [d for d in candidates if d not in existing and d not in no_data]
+        present = sum(1 for d in candidates if d in existing)
+        plan.append(ContractPlan(contract, start, end, candidates, missing, present, no_data))
+    return plan
+
+
+def build_topup_plan(config, index):
+    """
+    Plans only the sessions after the newest one on disk, each under the
+    contract that was front month that day.
+
+    Walks back from today's front month (up to config.max_contracts_back
+    contracts) to the first contract with a file inside its front-month
+    window. That contract is planned from the day after its newest file, every
+    newer contract in full. If none has any, only the current front month is
+    planned. The ledger is not consulted: the newest sessions are often "No
+    Data" only because they are not published yet.
+    """
+    last_date = get_last_date(config)
+    symbol = config.start_contract.split()[0]  # A root symbol or any contract of it
+    contract = get_front_contract(symbol, on=last_date, roll_offset=config.roll_offset)
+
+    windows = []
+    newest = None
+    for _ in range(config.max_contracts_back + 1):
+        start, end = get_front_month_period(contract, config.roll_offset)
+        end = min(end, last_date)
+        windows.append((contract, start, end))
+        in_window = [d for d in index.dates(contract) if start <= d <= end]
+        if in_window:
+            newest = max(in_window)
+            break
+        contract = get_previous_contract(contract)
+    else:
+        windows = windows[:1]
+
+    plan = []
+    for contract, start, end in windows:
+        existing = index.dates(contract)
+        present = sum(1 for d in existing if start <= d <= end)
+        first = newest + timedelta(days=1) if newest and contract == windows[-1][0] else start
+        candidates = session_dates(first, end, symbol)
+        missing = [d for d in candidates if d not in existing]
+        plan.append(ContractPlan(contract, start, end, candidates, missing, present))
+    return plan
+
+
+def plan_size(plan):
+    return sum(len(cp.missing) for cp in plan)
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
+
+
+def describe_plan(plan, seconds_per_date):
+    """Log lines summarising the plan: one per contract plus a total with the estimated time."""
+    lines = ["\n>>> GAP PLAN"]
+    for cp in plan:
+        if cp.end < cp.start:
+            lines.append(f"  {cp.contract}: not started yet")
+            continue
+        line = (f"  {cp.contract}: {cp.end:%m/%d/%Y} → {cp.start:%m/%d/%Y} | "
+                f"{cp.present} on disk | {len(cp.missing)} to download")
+        known = sum(1 for d in cp.sessions if d in cp.no_data)
+        if known:
+            line += f" | {known} known no-data"
+        lines.append(line)
+    total = plan_size(plan)
+    lines.append(f"PLAN: {total} dates across {len(plan)} contracts "
+                 f"(est. {format_duration(total * seconds_per_date)})")
+    return lines
@@ -0,0 +1,222 @@
+"""
+pywinauto driver for the NinjaTrader 8 "Historical Data" window (Windows only).
+"""
+import re
+import time
+import ctypes
+from collections import namedtuple
+
+import pyautogui
+from pywinauto import Desktop
+
+from mining_engine import ReplayDriver, STATE_READY, STATE_BUSY, STATE_POPUP
+
+POPUP_TITLES = ("Error", "NinjaTrader")
+DATE_PATTERN = re.compile(r'\d{1,2}/\d{1,2}/\d{4}')
+
+# Everything the engine needs to know about the UI on one poll tick
+StateSnapshot = namedtuple("StateSnapshot", ["enabled", "popup", "hwnd", "title"])
+
+
+def get_foreground_window():
+    """Returns (hwnd, title) of the window the user is actually looking at."""
+    hwnd = ctypes.windll.user32.GetForegroundWindow()
+    length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
+    buff = ctypes.create_unicode_buffer(length + 1)
+    ctypes.windll.user32.GetWindowTextW(hwnd, buff, length + 1)
+    return hwnd, buff.value
+
+
+def get_window_pid(hwnd):
+    pid = ctypes.c_ulong()
+    ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    return pid.value
+
+
+def find_historical_windows(desktop=None, title_re="^Historical Data.*"):
+    """Handles of every open Historical Data window (one per NinjaTrader instance or VM window)."""
+    desktop = desktop or Desktop(backend="uia")
+    try:
+        return [w.handle for w in desktop.windows(title_re=title_re)]
+    except Exception:
+        return []
+
+
+def create_window_drivers(desktop=None, title_re="^Historical Data.*"):
+    """One NT8WindowDriver per Historical Data window. Falls back to a single unbound driver."""
+    desktop = desktop or Desktop(backend="uia")
+    handles = find_historical_windows(desktop, title_re)
+    if len(handles) < 2:
+        return [NT8WindowDriver(desktop, title_re)]
+    return [NT8WindowDriver(desktop, title_re, handle=h) for h in handles]
+
+
+class NT8WindowDriver(ReplayDriver):
+    """
+    Resolves the window and its controls once and keeps the wrapper objects.
+    Each access is cheap; the handles are only re-resolved after a failed
+    access or when the window handle is no longer valid.
+    """
+
+    def __init__(self, desktop=None, title_re="^Historical Data.*", handle=None):
+        """handle binds the driver to one specific window (window pools); None means the first match."""
+        self.desktop = desktop or Desktop(backend="uia")
+        self.title_re = title_re
+        self.handle = handle
+        self.window = None
+        self.inst_edit = None
+        self.date_edits = []
+        self.dl_btn = None
+        self.snapshot = None  # Last StateSnapshot read by poll_state()
+
+    def _find_controls(self):
+        """Locate NT8 controls using pywinauto. Returns resolved wrappers."""
+        spec = self.desktop.window(handle=self.handle) if self.handle else self.desktop.window(title_re=self.title_re)
+        if not spec.exists():
+            return None, None, [], None
+        window = spec.wrapper_object()
+
+        # Find Edits
+        edits = window.descendants(control_type="Edit")
+        inst_edit = None
+        date_edits = []
+
+        for edit in edits:
+            text = edit.window_text()
+            # Simple heuristic: if it looks like a date, it's a date field
+            if DATE_PATTERN.search(text):
+                date_edits.append(edit)
+            else:
+                # If it's valid instrument text or just the first non-date edit
+                if not inst_edit:
+                    inst_edit = edit
+
+        # Find Download Button
+        try:
+            dl_btn = spec.child_window(title="Download", control_type="Button").wrapper_object()
+        except Exception:
+            dl_btn = None
+
+        return window, inst_edit, date_edits, dl_btn
+
+    def _alive(self):
+        """Cheap liveness check: controls resolved and the top-level window handle still valid."""
+        if not self.window or not self.inst_edit or not self.dl_btn:
+            return False
+        try:
+            return bool(ctypes.windll.user32.IsWindow(self.window.handle))
+        except Exception:
+            return False
+
+    def _resolve(self):
+        try:
+            self.window, self.inst_edit, self.date_edits, self.dl_btn = self._find_controls()
+        except Exception as e:
+            self.window = None
+            return f"Control search error: {e}"
+        if not self.window:
+            return "Historical Data window not found!"
+        if not self.inst_edit or not self.dl_btn:
+            return "Could not find Instrument input or Download button."
+        return None
+
+    def _with_controls(self, action):
+        """Runs action(); on failure re-resolves the cached handles once and retries."""
+        try:
+            return action()
+        except Exception:
+            error = self._resolve()
+            if error:
+                raise RuntimeError(error)
+            return action()
+
+    def connect(self):
+        if not self._alive():
+            error = self._resolve()
+            if error:
+                return error
+
+        # Bring to front once
+        try: self.window.set_focus()
+        except Exception: pass
+        return None
+
+    def set_instrument(self, contract):
+        self._with_controls(lambda: self.inst_edit.set_edit_text(contract))
+
+    def set_date(self, day):
+        """Types the date into every date field and reads it back; raises if a field doesn't show it."""
+        date_str = day.strftime("%m/%d/%Y")
+
+        def _set():
+            if not self.date_edits:
+                raise RuntimeError("Could not find the date fields.")
+            for de in self.date_edits:
+                de.set_edit_text(date_str)
+                shown = DATE_PATTERN.search(de.window_text())
+                if not shown or [int(p) for p in shown.group().split("/")] != [day.month, day.day, day.year]:
+                    raise RuntimeError(f"Date field shows '{de.window_text()}' instead of {date_str}")
+        self._with_controls(_set)
+
+    def click_download(self):
+        def _click():
+            if self.handle:
+                # In a window pool the other windows may have taken the foreground
+                try: self.window.set_focus()
+                except Exception: pass
+            if self.dl_btn.is_enabled():
+                self.dl_btn.click()
+            else:
+                self.dl_btn.invoke()
+        self._with_controls(_click)
+
+    @staticmethod
+    def _is_popup(title):
+        # Usually "Error" or "NinjaTrader". Never the Historical Data window itself.
+        return title in POPUP_TITLES and "Historical Data" not in title
+
+    def read_snapshot(self):
+        """
+        One batched read per poll tick: foreground window (Win32, cheap) and,
+        unless a popup is in front, the Download button state (one UIA call).
+        """
+        try:
+            hwnd, title = get_foreground_window()
+        except Exception:
+            hwnd, title = None, ""
+        popup = self._is_popup(title)
+        if popup and self.handle and hwnd:
+            # Another NinjaTrader instance's popup is not ours
+            try: popup = get_window_pid(hwnd) == get_window_pid(self.window.handle)
+            except Exception: pass
+        enabled = False if popup else self._with_controls(lambda: self.dl_btn.is_enabled())
+        self.snapshot = StateSnapshot(enabled, popup, hwnd, title)
+        return self.snapshot
+
+    def poll_state(self):
+        snap = self.read_snapshot()
+        if snap.popup:
+            return STATE_POPUP
+        return STATE_READY if snap.enabled else STATE_BUSY
+
+    def dismiss_popup(self):
+        """Closes the FOREGROUND window if the last snapshot (or a fresh read) shows an error popup."""
+        try:
+            snap = self.snapshot
+            if not snap or not snap.popup:
+                snap = self.read_snapshot()
+            if not snap.popup:
+                return None
+
+            # Active window is the popup. Just press Enter.
+            time.sleep(0.1)
+            pyautogui.press('enter')
+            time.sleep(0.1)
+
+            # Verify it's gone. If not, ESC.
+            if get_foreground_window()[0] == snap.hwnd:
+                pyautogui.press('escape')
+            self.snapshot = None
+            return snap.title
+        except Exception:
+            return None
@@ -0,0 +1,161 @@
+"""
+Local stand-in for the NinjaTrader "Historical Data" window.
+
+SimulatedHistoricalData is a ReplayDriver that behaves like the real
+window: an instrument field, From/To date fields and a Download button
+that disables while a download runs. Dates without data raise a "No
+Data" popup, and available dates write a .nrd file into the replay tree
+bit by bit while the transfer runs. Click reaction and download time are
+drawn from configurable latency distributions, so the engine can be run
+and benchmarked without Windows or NinjaTrader.
+
+    sim = SimulatedHistoricalData(replay_root, first_available=date(2025, 9, 1))
+    MiningEngine(config, sim).run()
+"""
+import os
+import random
+import threading
+import time
+
+from mining_engine import ReplayDriver, STATE_READY, STATE_BUSY, STATE_POPUP, replay_filename
+
+NO_DATA_TITLE = "Error"  # Title of NinjaTrader's "No Data" message box
+
+
+class Latency:
+    """Lognormal latency around a median (seconds). spread is the sigma of the underlying normal."""
+
+    def __init__(self, median, spread=0.3, minimum=0.0):
+        self.median = median
+        self.spread = spread
+        self.minimum = minimum
+
+    def sample(self, rng):
+        if not self.spread:
+            return max(self.minimum, self.median)
+        return max(self.minimum, self.median * rng.lognormvariate(0.0, self.spread))
+
+    def scaled(self, factor):
+        return Latency(self.median * factor, self.spread, self.minimum * factor)
+
+
+class SimulatedHistoricalData(ReplayDriver):
+    def __init__(self, replay_root, first_available=None, no_data_dates=(), reaction=None, download=None,
+                 file_size=200_000, no_reaction_rate=0.0, stall_rate=0.0, seed=None):
+        """
+        first_available: oldest date the "server" has data for (None = all dates)
+        no_data_dates: extra dates that answer with the No Data popup
+        no_reaction_rate / stall_rate: chance a click is ignored / a transfer hangs halfway
+        """
+        self.replay_root = replay_root
+        self.first_available = first_available
+        self.no_data_dates = set(no_data_dates)
+        self.reaction = reaction or Latency(0.3, 0.4)
+        self.download = download or Latency(2.0, 0.5)
+        self.file_size = file_size
+        self.no_reaction_rate = no_reaction_rate
+        self.stall_rate = stall_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Window fields
+        self.instrument = ""
+        self.date_from = None
+        self.date_to = None
+        self.button_enabled = True
+        self.popup = None
+
+        # The click being answered: a pending popup or a running download
+        self._job = None
+        self.stats = {"clicks": 0, "popups": 0, "downloads": 0, "ignored": 0, "stalls": 0}
+
+    def has_data(self, day):
+        if day in self.no_data_dates:
+            return False
+        return self.first_available is None or day >= self.first_available
+
+    # === ReplayDriver ===
+    def connect(self):
+        return None
+
+    def set_instrument(self, contract):
+        self.instrument = contract
+
+    def set_date(self, day):
+        self.date_from = self.date_to = day
+
+    def click_download(self):
+        with self._lock:
+            self.stats["clicks"] += 1
+            if not self.button_enabled or self.popup:
+                return
+            if self.rng.random() < self.no_reaction_rate:
+                self.stats["ignored"] += 1
+                return
+            now = time.monotonic()
+            react_at = now + self.reaction.sample(self.rng)
+            if not self.has_data(self.date_to):
+                self._job = {"popup_at": react_at}
+                return
+            folder = os.path.join(self.replay_root, self.instrument)
+            os.makedirs(folder, exist_ok=True)
+            self._job = {
+                "path": os.path.join(folder, replay_filename(self.date_to)),
+                "react_at": react_at,
+                "done_at": react_at + self.download.sample(self.rng),
+                "total": int(self.file_size * self.rng.uniform(0.7, 1.3)),
+                "written": 0,
+                "stalls": self.rng.random() < self.stall_rate,
+            }
+
+    def poll_state(self):
+        with self._lock:
+            self._advance(time.monotonic())
+            if self.popup:
+                return STATE_POPUP
+            return STATE_READY if self.button_enabled else STATE_BUSY
+
+    def dismiss_popup(self):
+        with self._lock:
+            title, self.popup = self.popup, None
+            return title
+
+    def cancel_download(self):
+        with self._lock:
+            if self._job is None or self.button_enabled:
+                return False
+            self._job = None
+            self.button_enabled = True
+            return True
+
+    # === Simulation ===
+    def _advance(self, now):
+        job = self._job
+        if job is None:
+            return
+        if "popup_at" in job:
+            if now >= job["popup_at"]:
+                self.popup = NO_DATA_TITLE
+                self.stats["popups"] += 1
+                self._job = None
+            return
+        if now < job["react_at"]:
+            return
+        self.button_enabled = False
+
+        progress = min(1.0, (now - job["react_at"]) / max(job["done_at"] - job["react_at"], 1e-6))
+        if job["stalls"]:
+            if progress >= 0.5 and job["written"] and job["stalls"] is True:
+                self.stats["stalls"] += 1
+                job["stalls"] = "hung"
+            if job["stalls"] == "hung":
+                return  # Button stays disabled, no more bytes
+        target = int(job["total"] * progress)
+        if target > job["written"]:
+            with open(job["path"], "ab" if job["written"] else "wb") as f:
+                f.write(b"N" * (target - job["written"]))
+            job["written"] = target
+        if progress >= 1.0:
+            self.stats["downloads"] += 1
+            self.button_enabled = True
+            self._job = None
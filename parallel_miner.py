@@ -0,0 +1,333 @@
+"""
+Parallel mining across several "Historical Data" windows.
+
+Every matching window (several NinjaTrader instances, or VMs exposing
+their windows) gets its own driver and its own MiningEngine on a worker
+thread. The workers pull (contract, date) items from one shared
+DateWorkQueue. Typing, clicking and reading the reaction happen under one
+UI lock, because popups are detected from the foreground window. The
+downloads themselves overlap.
+
+Dates are handed out newest first per contract, the same order as the
+serial walk, unless a PriorityPolicy (work_priority) puts needed ranges
+and recent sessions first. A contract is cut off once stop_loss_limit
+consecutive sessions came back "No Data"; needed dates are still handed
+out after the cut.
+
+With search_mode "boundary" (and no priority policy) the windows take
+whole contracts instead, each running the engine's binary history search.
+"""
+import threading
+import time
+
+from mining_engine import MiningEngine, run_instrumented, ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_TRANSIENT
+from mining_events import EventBus, LogMessage
+from mining_plan import describe_plan, plan_size
+from retry_queue import RetryQueue
+from work_priority import TIER_HISTORY, create_policy
+
+
+class DateWorkQueue:
+    """Thread-safe (contract, date) work items shared by the workers of a window pool."""
+
+    def __init__(self, plan, stop_loss_limit, retries, policy=None, retry_scope="contract"):
+        """retry_scope "contract" hands out due retries first; "run" only once the fresh dates are used up."""
+        self._lock = threading.Condition()
+        self.stop_loss_limit = stop_loss_limit
+        self.retries = retries
+        self.policy = policy
+        self.retry_scope = retry_scope
+        self._order = []     # Contracts in mining order
+        self._dates = {}     # contract -> dates to walk, newest first
+        self._next = {}      # contract -> index of the next date in walk order
+        self._issued = {}    # contract -> dates handed out (needed dates can jump ahead of the walk)
+        self._results = {}   # contract -> {date: ATTEMPT_*}
+        self._cut = set()    # Contracts whose history has run out
+        self._in_flight = 0
+        for cp in plan:
+            if not cp.missing:
+                continue
+            existing = set(cp.sessions) - set(cp.missing) - cp.no_data
+            self._order.append(cp.contract)
+            self._dates[cp.contract] = [d for d in cp.sessions if d not in existing]
+            self._next[cp.contract] = 0
+            self._issued[cp.contract] = set()
+            # Known "No Data" dates count as misses without an attempt
+            self._results[cp.contract] = {d: ATTEMPT_NO_DATA for d in cp.no_data if d in cp.sessions}
+
+    def _walk_head(self, contract):
+        """Next date of the newest-first walk that has not been handed out, or None."""
+        dates, results, issued = self._dates[contract], self._results[contract], self._issued[contract]
+        while self._next[contract] < len(dates):
+            day = dates[self._next[contract]]
+            if day not in results and day not in issued:
+                return day
+            self._next[contract] += 1
+        return None
+
+    def _pick(self, preferred):
+        """(contract, date) to hand out next, or None. Without a policy: the walk, preferred contract first."""
+        needs, recent_since = (), None
+        if self.policy:
+            needs, recent_since = self.policy.needs(), self.policy.recent_since()
+        best, best_key = None, None
+        for position, contract in enumerate(self._order):
+            candidates = []
+            head = None if contract in self._cut else self._walk_head(contract)
+            if head:
+                candidates.append(head)
+            if needs:
+                results, issued = self._results[contract], self._issued[contract]
+                candidates.extend(day for day in self._dates[contract]
+                                  if day != head and day not in results and day not in issued
+                                  and any(needed.matches(contract, day) for needed in needs))
+            for day in candidates:
+                tier = self.policy.tier(contract, day, needs, recent_since) if self.policy else TIER_HISTORY
+                if tier == TIER_HISTORY:
+                    # Stay on the window's contract, then chain order
+                    key = (tier, contract != preferred, position, -day.toordinal())
+                else:
+                    key = (tier, -day.toordinal(), contract != preferred, position)
+                if best_key is None or key < best_key:
+                    best, best_key = (contract, day), key
+        return best
+
+    def _check_cut(self, contract):
+        """Cuts the contract once the completed, in-order prefix has stop_loss_limit No Data dates in a row."""
+        streak = 0
+        results = self._results[contract]
+        for day in self._dates[contract]:
+            result = results.get(day)
+            if result is None:
+                break  # Not answered yet; later results can't be judged in order
+            if result == ATTEMPT_NO_DATA:
+                streak += 1
+                if streak >= self.stop_loss_limit:
+                    self._cut.add(contract)
+                    return
+            elif result == ATTEMPT_HIT:
+                streak = 0
+
+    def finished(self):
+        """True once nothing is in flight, waiting for a retry or left to hand out."""
+        with self._lock:
+            if self._in_flight or len(self.retries):
+                return False
+            return self._pick(None) is None
+
+    def _next_retry(self, preferred):
+        item = self.retries.pop(preferred, due_only=True) or self.retries.pop(due_only=True)
+        return item and (item.contract, item.day, item.attempts + 1)
+
+    def next_item(self, preferred=None, stop=lambda: False, block=True):
+        """
+        Blocks until an item is available and returns (contract, date, attempts).
+        Due retries come first (last with retry_scope "run"), then the policy's order; among equals the contract the
+        worker's window is already on wins. Returns None when all
+        work is done (or, with block=False, when nothing can be handed out right now).
+        """
+        with self._lock:
+            while not stop():
+                item = self._next_retry(preferred) if self.retry_scope == "contract" else None
+                if item is None:
+                    picked = self._pick(preferred)
+                    if picked:
+                        contract, day = picked
+                        self._issued[contract].add(day)
+                        item = (contract, day, 1)
+                if item is None and self.retry_scope != "contract":
+                    item = self._next_retry(preferred)
+                if item:
+                    self._in_flight += 1
+                    return item
+                if not block or (not self._in_flight and not len(self.retries)):
+                    return None
+                self._lock.wait(0.25)  # In-flight results or a retry backoff may still add work
+            return None
+
+    def complete(self, item, result):
+        contract, day, attempts = item
+        with self._lock:
+            self._in_flight -= 1
+            # A transient result is neutral for the streak until a retry answers it
+            self._results[contract][day] = result
+            if result == ATTEMPT_TRANSIENT:
+                self.retries.defer(contract, day, attempts)
+            else:
+                self._check_cut(contract)
+            self._lock.notify_all()
+
+
+class ParallelMiner:
+    """Same interface as MiningEngine (run/stop), driving one engine per window."""
+
+    def __init__(self, config, drivers, log=None, events=None):
+        self.config = config
+        self.drivers = list(drivers)
+        self.events = events or EventBus()
+        if log:
+            self.events.subscribe(lambda e: log(e.text), [LogMessage])
+        self.ui_lock = threading.Lock()
+        self.stop_requested = False
+        self.work = None  # The running DateWorkQueue (its policy takes needed ranges live)
+        # The planner owns the index and ledger that every worker engine shares
+        self.planner = MiningEngine(config, None, events=self.events)
+        self.engines = [MiningEngine(config, driver, events=self.events, index=self.planner.index,
+                                     ledger=self.planner.ledger, ui_lock=self.ui_lock)
+                        for driver in self.drivers]
+
+    def stop(self):
+        self.stop_requested = True
+        for engine in self.engines:
+            engine.stop()
+
+    def log(self, text):
+        self.events.publish(LogMessage(text))
+
+    def plan(self):
+        return self.planner.plan()
+
+    def run(self):
+        """Plans the mine and runs every window until the work is done. Returns a summary dict."""
+        return run_instrumented(self.config, self.engines, self.events, self._run)
+
+    def _run(self, profiler):
+        cfg = self.config
+        summary = {"contracts": [], "downloaded": 0, "stopped": False, "error": None, "windows": []}
+        started = time.monotonic()
+
+        self.log(f"\n{'='*50}")
+        if len(self.engines) > 1:
+            self.log(f"⚡ STARTING PARALLEL MINE ON {len(self.engines)} WINDOWS ⚡")
+        else:
+            self.log("⚡ STARTING PRIORITISED MINE ⚡")
+
+        plan = self.plan()
+        for line in describe_plan(plan, cfg.est_seconds_per_date / max(len(self.engines), 1)):
+            self.log(line)
+        if not plan_size(plan):
+            self.log("Nothing to download. The archive is up to date.")
+
+        policy = create_policy(cfg, log=self.log)
+        if policy:
+            self.log(f"Priority: {policy.mode}" + (f", needs file {policy.needs_path}" if policy.needs_path else ""))
+            if cfg.search_mode == "boundary":
+                self.log("⚠ Binary search is off for this run: the priority policy orders single dates, "
+                         "so every contract is walked")
+
+        errors = [None] * len(self.engines)
+        counts = [{} for _ in self.engines]  # Per window: contract -> files landed
+        totals = [0] * len(self.engines)     # Per window: files landed, including run-scope retries
+        if cfg.search_mode == "boundary" and policy is None:
+            # Whole contracts per window, each with the engine's binary history search
+            contracts = [cp for cp in plan if cp.missing]
+            work, target = None, self._search_work
+            args = (contracts, threading.Lock())
+        else:
+            work = DateWorkQueue(plan, cfg.stop_loss_limit,
+                                 RetryQueue(cfg.retry_base_delay, cfg.retry_max_delay, cfg.retry_attempts),
+                                 policy, cfg.retry_scope)
+            target, args = self._walk_work, (work,)
+        self.work = work
+
+        threads = []
+        for i, engine in enumerate(self.engines):
+            run = profiler.profile_thread(target) if profiler else target
+            threads.append(threading.Thread(target=run, args=(i, engine, errors, counts[i], totals) + args,
+                                            daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        per_contract = {}
+        for i in range(len(self.engines)):
+            summary["windows"].append({"window": i + 1, "downloaded": totals[i], "error": errors[i]})
+            for contract, count in counts[i].items():
+                per_contract[contract] = per_contract.get(contract, 0) + count
+        summary["downloaded"] = sum(totals)
+        summary["contracts"] = [{"contract": c, "downloaded": n} for c, n in per_contract.items()]
+        if all(errors):
+            summary["error"] = errors[0]
+        if work is not None:
+            summary["retries_left"] = len(work.retries)
+        else:
+            summary["retries_left"] = sum(len(engine.retries) for engine in self.engines)
+        summary["stopped"] = self.stop_requested
+        summary["elapsed"] = round(time.monotonic() - started, 1)
+
+        windows = f" on {len(self.engines)} windows" if len(self.engines) > 1 else ""
+        self.log(f"\n✓ MINING COMPLETE: {summary['downloaded']} files{windows} in {summary['elapsed']:.0f}s")
+        return summary
+
+    def _connect(self, number, engine, errors):
+        with self.ui_lock:
+            error = engine.driver.connect()
+        if error:
+            self.log(f"[Window {number + 1}] ERROR: {error}")
+            errors[number] = error
+        return not error
+
+    def _walk_work(self, number, engine, errors, counts, totals, work):
+        if not self._connect(number, engine, errors):
+            return
+        engine.downloaded_count = 0
+        consecutive_transient = 0
+        while not self.stop_requested:
+            item = work.next_item(engine.current_contract, stop=lambda: self.stop_requested)
+            if item is None:
+                break
+            contract, day, attempts = item
+            try:
+                if contract != engine.current_contract:
+                    engine.select_contract(contract)
+                result = engine.attempt_date(contract, day)
+            except Exception as e:
+                self.log(f"[Window {number + 1}] ERROR on {contract} {day}: {e}")
+                errors[number] = str(e)
+                work.complete(item, ATTEMPT_TRANSIENT)
+                break
+            if result == ATTEMPT_HIT:
+                counts[contract] = counts.get(contract, 0) + 1
+                totals[number] += 1
+            work.complete(item, result)
+            engine.progress(f"Total: {sum(totals)} | Window {number + 1}: {contract} {day}")
+            # A window that keeps getting no usable reaction is left out; the others take its dates
+            consecutive_transient = consecutive_transient + 1 if result == ATTEMPT_TRANSIENT else 0
+            if consecutive_transient >= self.config.transient_limit:
+                self.log(f"[Window {number + 1}] No usable reaction for {consecutive_transient} dates in a row. "
+                         f"Stopping this window.")
+                errors[number] = "No usable reaction"
+                break
+
+    def _search_work(self, number, engine, errors, counts, totals, contracts, lock):
+        if not self._connect(number, engine, errors):
+            return
+        while not self.stop_requested:
+            with lock:
+                if not contracts:
+                    break
+                contract_plan = contracts.pop(0)
+            self.log(f"\n>>> [Window {number + 1}] PROCESSING CONTRACT: {contract_plan.contract}")
+            try:
+                landed = engine.mine_contract(contract_plan)
+            except Exception as e:
+                self.log(f"[Window {number + 1}] ERROR on {contract_plan.contract}: {e}")
+                errors[number] = str(e)
+                return
+            counts[contract_plan.contract] = counts.get(contract_plan.contract, 0) + landed
+            totals[number] += landed
+        if self.config.retry_scope == "run" and not self.stop_requested:
+            totals[number] += engine.retry_deferred()
+
+
+def create_miner(config, drivers, events=None):
+    """
+    A MiningEngine for one driver, a ParallelMiner for several. A prioritised
+    mine goes through the shared work queue even with one window; it gets the
+    same metrics and profiling (run_instrumented), but walks instead of
+    running the binary history search.
+    """
+    if len(drivers) == 1 and create_policy(config) is None:
+        return MiningEngine(config, drivers[0], events=events)
+    return ParallelMiner(config, drivers, events=events)
@@ -0,0 +1,172 @@
+"""
+Opt-in profiling of a mining run.
+
+Enable with the NT8_MINER_PROFILE environment variable (or the CLI's
+--profile flag):
+
+    cprofile - full cProfile of the run, dumped as a .prof file
+               (open with `python -m pstats` or snakeviz)
+    spans    - low-overhead span recorder around the automation hot spots
+               (driver calls, popup checks, replay index scans, file checks,
+               ledger writes), dumped as JSON
+
+One file per run goes to ~/.nt8_replay_miner/profiles.
+"""
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "NT8_MINER_PROFILE"
+PROFILE_MODES = ("cprofile", "spans")
+PROFILE_ON = ("1", "true", "yes", "on")     # Shorthands for cprofile
+PROFILE_OFF = ("", "0", "false", "no", "off")
+
+# Methods wrapped by the span recorder, per engine component
+DRIVER_SPANS = ("connect", "_find_controls", "_alive", "set_instrument", "set_date", "click_download",
+                "poll_state", "read_snapshot", "dismiss_popup")
+INDEX_SPANS = ("dates", "refresh")
+LEDGER_SPANS = ("record", "known_no_data")
+ENGINE_SPANS = ("_set_aside_partial", "_dismiss_popup")
+
+
+def get_profile_mode():
+    """Profile mode requested through the environment, or None. Unknown values are logged and ignored."""
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if mode in PROFILE_MODES:
+        return mode
+    if mode in PROFILE_ON:
+        return "cprofile"
+    if mode not in PROFILE_OFF:
+        logging.getLogger("nt8_replay_miner").warning(
+            "Ignoring %s=%r. Expected one of: %s", PROFILE_ENV, mode, ", ".join(PROFILE_MODES))
+    return None
+
+
+def get_default_profile_dir():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "profiles")
+
+
+def _profile_path(folder, suffix):
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, time.strftime("profile_%Y%m%d_%H%M%S") + suffix)
+
+
+class CProfileSession:
+    def __init__(self, folder):
+        self.folder = folder
+        self.profiler = cProfile.Profile()
+        self._thread_profilers = []
+        self._started = False
+
+    def start(self, engine):
+        if not self._started:
+            self._started = True
+            self.profiler.enable()
+
+    def profile_thread(self, target):
+        """Wraps a worker thread's target: cProfile only sees the thread that enabled it."""
+        def run(*args, **kwargs):
+            profiler = cProfile.Profile()
+            self._thread_profilers.append(profiler)
+            profiler.enable()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                profiler.disable()
+        return run
+
+    def stop(self):
+        self.profiler.disable()
+        path = _profile_path(self.folder, ".prof")
+        stats = pstats.Stats(self.profiler)
+        for profiler in self._thread_profilers:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        return path
+
+
+class SpanRecorder:
+    """Counts calls and wall time of named spans. Wraps methods on live objects, no code edits needed."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.spans = {}
+        self._patched = []
+        self._lock = threading.Lock()  # Window pool engines record from several threads
+
+    def add(self, name, seconds):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = {"count": 0, "total": 0.0, "max": 0.0}
+            stats["count"] += 1
+            stats["total"] += seconds
+            if seconds > stats["max"]:
+                stats["max"] = seconds
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def instrument(self, obj, method_names, prefix):
+        """Wraps the named methods of obj (those that exist) until stop(). Shared objects are wrapped once."""
+        if obj is None:
+            return
+        for name in method_names:
+            original = getattr(obj, name, None)
+            if not callable(original) or any(o is obj and n == name for o, n in self._patched):
+                continue
+
+            def wrapper(*args, _original=original, _span=f"{prefix}.{name}", **kwargs):
+                started = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    self.add(_span, time.perf_counter() - started)
+
+            functools.update_wrapper(wrapper, original)
+            setattr(obj, name, wrapper)
+            self._patched.append((obj, name))
+
+    def start(self, engine):
+        self.instrument(engine.driver, DRIVER_SPANS, "driver")
+        self.instrument(engine.index, INDEX_SPANS, "index")
+        self.instrument(engine.ledger, LEDGER_SPANS, "ledger")
+        self.instrument(engine, ENGINE_SPANS, "engine")
+
+    def profile_thread(self, target):
+        return target  # Spans are recorded on every thread
+
+    def stop(self):
+        for obj, name in self._patched:
+            try: delattr(obj, name)  # Drops the instance attribute, the class method shows through again
+            except AttributeError: pass
+        self._patched = []
+
+        path = _profile_path(self.folder, ".json")
+        ordered = sorted(self.spans.items(), key=lambda item: -item[1]["total"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({name: {**stats, "mean": stats["total"] / stats["count"]} for name, stats in ordered}, f, indent=1)
+        return path
+
+
+def create_profiler(mode, folder=None):
+    """Returns a profiler session for mode, or None when profiling is off."""
+    if not mode:
+        return None
+    folder = folder or get_default_profile_dir()
+    if mode == "cprofile":
+        return CProfileSession(folder)
+    if mode == "spans":
+        return SpanRecorder(folder)
+    raise ValueError(f"Unknown profile mode '{mode}'. Expected one of: {', '.join(PROFILE_MODES)}")
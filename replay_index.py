@@ -0,0 +1,66 @@
+"""
+In-memory index of the market replay files already on disk.
+
+Each db/replay/<contract> folder is scanned once with os.scandir and kept
+current as downloads land, so the date loop never has to hit the
+filesystem to decide whether a day is already present.
+"""
+import os
+from datetime import date
+
+
+def parse_replay_filename(name):
+    """Returns the session date for a 'YYYYMMDD.nrd' file name, or None."""
+    stem, ext = os.path.splitext(name)
+    if ext.lower() != ".nrd" or len(stem) != 8 or not stem.isdigit():
+        return None
+    try:
+        return date(int(stem[:4]), int(stem[4:6]), int(stem[6:]))
+    except ValueError:
+        return None
+
+
+def scan_contract_dir(path):
+    """Returns the set of session dates with a .nrd file in path (empty if the folder is missing)."""
+    dates = set()
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                day = parse_replay_filename(entry.name)
+                if day:
+                    dates.add(day)
+    except FileNotFoundError:
+        pass
+    return dates
+
+
+class ReplayIndex:
+    def __init__(self, replay_root):
+        self.replay_root = replay_root
+        self._dates = {}
+
+    def contract_dir(self, contract):
+        return os.path.join(self.replay_root, contract)
+
+    def dates(self, contract):
+        """Set of dates present for contract. Scanned on first access, then cached."""
+        if contract not in self._dates:
+            self._dates[contract] = scan_contract_dir(self.contract_dir(contract))
+        return self._dates[contract]
+
+    def has(self, contract, day):
+        return day in self.dates(contract)
+
+    def add(self, contract, day):
+        """Records a file that has just landed."""
+        self.dates(contract).add(day)
+
+    def discard(self, contract, day):
+        """Treats a file as missing (e.g. it failed verification) so it gets downloaded again."""
+        self.dates(contract).discard(day)
+
+    def refresh(self, contract):
+        """Drops the cached scan so the next access re-reads the folder."""
+        self._dates.pop(contract, None)
@@ -0,0 +1,140 @@
+"""
+Integrity check of the .nrd files already on disk.
+
+Existence alone does not mean a day is done: a killed download or a
+timed-out transfer can leave an empty or truncated file behind. Each
+contract folder is checked in parallel:
+
+    empty      - zero bytes
+    unreadable - the header can't be read, is too short or is all zero bytes
+    small      - far smaller than the contract's other days (likely truncated)
+
+Results (and optional SHA-256 hashes) are cached in a per-contract JSON
+manifest keyed by file mtime and size, so re-verification only reads new
+or changed files. A suspect file is moved aside (renamed to .nrd.bad)
+before its day is downloaded again, so the old file can't be mistaken for
+the new download.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from replay_index import parse_replay_filename
+
+HEADER_BYTES = 64
+MIN_PEERS = 5            # Peers needed before the size check applies
+MIN_SIZE_RATIO = 0.05    # "small" below this fraction of the median peer size
+
+REASON_EMPTY = "empty"
+REASON_UNREADABLE = "unreadable"
+REASON_SMALL = "small"
+
+SUSPECT_SUFFIX = ".bad"
+
+
+def get_default_manifest_dir():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "manifests")
+
+
+def _manifest_path(manifest_dir, contract):
+    return os.path.join(manifest_dir, contract.replace(" ", "_") + ".json")
+
+
+def load_manifest(manifest_dir, contract):
+    try:
+        with open(_manifest_path(manifest_dir, contract), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_dir, contract, manifest):
+    os.makedirs(manifest_dir, exist_ok=True)
+    path = _manifest_path(manifest_dir, contract)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def check_file(path, size, with_hash=False):
+    """Reads the header (and the whole file when hashing). Returns (reason or None, sha256 or None)."""
+    if size == 0:
+        return REASON_EMPTY, None
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+            if len(header) < min(size, HEADER_BYTES) or not header.strip(b"\0"):
+                return REASON_UNREADABLE, None
+            if not with_hash:
+                return None, None
+            digest = hashlib.sha256(header)
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+            return None, digest.hexdigest()
+    except OSError:
+        return REASON_UNREADABLE, None
+
+
+def set_aside(folder, day):
+    """Renames the day's .nrd to .nrd.bad (replacing an older one). Raises OSError."""
+    path = os.path.join(folder, f"{day:%Y%m%d}.nrd")
+    os.replace(path, path + SUSPECT_SUFFIX)
+    return path + SUSPECT_SUFFIX
+
+
+def median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def verify_contract(folder, contract, manifest_dir=None, with_hash=False, workers=4):
+    """
+    Checks every .nrd file in folder. Returns {date: reason} for the suspect ones.
+    Files whose mtime and size match the manifest are not read again.
+    """
+    manifest_dir = manifest_dir or get_default_manifest_dir()
+    manifest = load_manifest(manifest_dir, contract)
+
+    files = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                day = parse_replay_filename(entry.name)
+                if day and entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = (day, st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        return {}
+
+    def needs_check(name):
+        cached = manifest.get(name)
+        _, size, mtime_ns = files[name]
+        return (cached is None or cached["size"] != size or cached["mtime_ns"] != mtime_ns
+                or (with_hash and not cached.get("sha256") and not cached.get("reason")))
+
+    stale = [name for name in files if needs_check(name)]
+    if stale:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda name: check_file(os.path.join(folder, name), files[name][1], with_hash), stale)
+            for name, (reason, sha256) in zip(stale, results):
+                _, size, mtime_ns = files[name]
+                manifest[name] = {"size": size, "mtime_ns": mtime_ns, "reason": reason, "sha256": sha256}
+
+    # Files that were removed since the last pass
+    for name in set(manifest) - set(files):
+        del manifest[name]
+    if stale or len(manifest) != len(files):
+        save_manifest(manifest_dir, contract, manifest)
+
+    suspect = {files[name][0]: entry["reason"] for name, entry in manifest.items() if entry["reason"]}
+
+    # Size sanity against the contract's healthy days (recomputed every pass, peers change)
+    healthy = [files[name][1] for name, entry in manifest.items() if not entry["reason"]]
+    if len(healthy) >= MIN_PEERS:
+        floor = median(healthy) * MIN_SIZE_RATIO
+        for name, (day, size, _) in files.items():
+            if day not in suspect and size < floor:
+                suspect[day] = REASON_SMALL
+    return suspect
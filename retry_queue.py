@@ -0,0 +1,53 @@
+"""
+Deferred retries for transient failures.
+
+A date that got no reaction, a late error popup or a stalled transfer
+says nothing about whether the data exists, so it is parked here with an
+exponential backoff and re-attempted at the end of the contract (or run)
+instead of counting toward the stop-loss streak.
+"""
+import time
+from collections import namedtuple
+
+RetryItem = namedtuple("RetryItem", ["due", "contract", "day", "attempts"])
+
+
+class RetryQueue:
+    def __init__(self, base_delay=5.0, max_delay=60.0, max_attempts=3):
+        """max_attempts counts the first attempt, so 3 means two retries."""
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def delay(self, attempts):
+        """Backoff after the given number of failed attempts: base, 2*base, 4*base, ... capped at max_delay."""
+        return min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+
+    def defer(self, contract, day, attempts=1):
+        """Queues a retry after attempts failures. Returns the delay, or None once attempts are used up."""
+        if attempts >= self.max_attempts:
+            return None
+        delay = self.delay(attempts)
+        self._items.append(RetryItem(time.monotonic() + delay, contract, day, attempts))
+        return delay
+
+    def pending(self, contract=None):
+        return sum(1 for item in self._items if contract is None or item.contract == contract)
+
+    def pop(self, contract=None, due_only=False):
+        """
+        Removes and returns the retry due first (optionally only for contract), or None.
+        With due_only, retries whose backoff has not run out yet are left alone.
+        """
+        now = time.monotonic()
+        candidates = [item for item in self._items
+                      if (contract is None or item.contract == contract) and (not due_only or item.due <= now)]
+        if not candidates:
+            return None
+        item = min(candidates, key=lambda item: item.due)
+        self._items.remove(item)
+        return item
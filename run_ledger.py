@@ -0,0 +1,123 @@
+"""
+Persistent run ledger (SQLite).
+
+Every attempted (contract, date) is recorded with its outcome, duration
+and timestamp, so a crashed or stopped mine resumes where it left off and
+known "No Data" dates are not retried until their TTL runs out.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# Ledger outcomes
+RESULT_DOWNLOADED = "downloaded"
+RESULT_NO_DATA = "no_data"
+RESULT_ERROR_LATE = "error_late"
+RESULT_NO_REACTION = "no_reaction"
+RESULT_STALLED = "stalled"
+RESULT_DATE_FAILED = "date_failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    contract     TEXT NOT NULL,
+    day          TEXT NOT NULL,
+    outcome      TEXT NOT NULL,
+    duration     REAL,
+    attempted_at REAL NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (contract, day)
+)
+"""
+
+
+def get_default_ledger_path():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "ledger.sqlite3")
+
+
+class RunLedger:
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, contract, day, outcome, duration=None):
+        """Stores the latest outcome for (contract, day). Earlier attempts are counted, not kept."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO attempts (contract, day, outcome, duration, attempted_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(contract, day) DO UPDATE SET outcome=excluded.outcome, duration=excluded.duration, "
+                "attempted_at=excluded.attempted_at, attempts=attempts + 1",
+                (contract, day.isoformat(), outcome, duration, time.time()))
+            self._conn.commit()
+
+    def get(self, contract, day):
+        """Returns (outcome, duration, attempted_at, attempts) or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT outcome, duration, attempted_at, attempts FROM attempts WHERE contract = ? AND day = ?",
+                (contract, day.isoformat())).fetchone()
+
+    def dates_with_outcome(self, contract, outcome, max_age_days=None):
+        """Set of dates whose latest outcome is `outcome`, optionally only if recorded within max_age_days."""
+        query = "SELECT day FROM attempts WHERE contract = ? AND outcome = ?"
+        params = [contract, outcome]
+        if max_age_days is not None:
+            query += " AND attempted_at >= ?"
+            params.append(time.time() - max_age_days * 86400)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {date.fromisoformat(row[0]) for row in rows}
+
+    def known_no_data(self, contract, ttl_days, settle_days=0):
+        """
+        Dates that returned "No Data" within the last ttl_days. An answer recorded
+        less than settle_days after the session is left out: the data may simply
+        not have been published yet.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, attempted_at FROM attempts WHERE contract = ? AND outcome = ? AND attempted_at >= ?",
+                (contract, RESULT_NO_DATA, time.time() - ttl_days * 86400)).fetchall()
+        known = set()
+        for day_text, attempted_at in rows:
+            day = date.fromisoformat(day_text)
+            settled_at = datetime.combine(day + timedelta(days=settle_days), datetime.min.time()).timestamp()
+            if attempted_at >= settled_at:
+                known.add(day)
+        return known
+
+    def coverage(self, contract=None):
+        """{contract: {outcome: count}} for one contract or all of them."""
+        query = "SELECT contract, outcome, COUNT(*) FROM attempts"
+        params = []
+        if contract:
+            query += " WHERE contract = ?"
+            params.append(contract)
+        query += " GROUP BY contract, outcome"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        result = {}
+        for name, outcome, count in rows:
+            result.setdefault(name, {})[outcome] = count
+        return result
+
+    def date_range(self, contract, outcome=RESULT_DOWNLOADED):
+        """(oldest, newest) date with the given outcome, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(day), MAX(day) FROM attempts WHERE contract = ? AND outcome = ?",
+                (contract, outcome)).fetchone()
+        if not row or not row[0]:
+            return None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1])
@@ -0,0 +1,137 @@
+"""
+Per-date phase timing for a mining run.
+
+Each attempted date gets one row with the time spent in every phase
+(set date, wait for the button, click, outcome detection, download,
+throttle). Per-contract phases such as finding controls and setting the
+instrument only go into the run totals. At the end of a run the rows and
+per-phase summaries (percentiles plus a histogram) are exported as CSV
+and JSON. A window pool merges the metrics of its engines into one export.
+"""
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from adaptive_timing import percentile
+
+PHASES = ("find_controls", "set_instrument", "set_date", "wait_enabled", "click",
+          "detect_outcome", "download", "throttle")
+
+# Histogram bucket upper bounds in seconds (the last bucket is open-ended)
+HISTOGRAM_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def get_default_metrics_dir():
+    return os.path.join(os.path.expanduser("~"), ".nt8_replay_miner", "metrics")
+
+
+def histogram(samples):
+    """{'<=0.05': n, ..., '>300.0': n} counts for HISTOGRAM_BOUNDS."""
+    labels = [f"<={b}" for b in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}"]
+    counts = dict.fromkeys(labels, 0)
+    for value in samples:
+        for bound, label in zip(HISTOGRAM_BOUNDS, labels):
+            if value <= bound:
+                counts[label] += 1
+                break
+        else:
+            counts[labels[-1]] += 1
+    return counts
+
+
+class RunMetrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.rows = []
+        self.samples = {phase: [] for phase in PHASES}
+        self._row = None
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as one phase of the current date (or of the run if no date is open)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.samples[name].append(seconds)
+        if self._row is not None:
+            self._row[name] = self._row.get(name, 0.0) + seconds
+
+    def begin_date(self, contract, day):
+        self._row = {"contract": contract, "date": day.isoformat(), "started": time.time()}
+
+    def end_date(self, outcome, landed):
+        if self._row is None:
+            return
+        self._row["outcome"] = outcome
+        self._row["landed"] = landed
+        self._row["total"] = sum(self._row.get(p, 0.0) for p in PHASES)
+        self.rows.append(self._row)
+        self._row = None
+
+    @classmethod
+    def merged(cls, parts):
+        """One RunMetrics holding the rows (in start order) and samples of several, e.g. one per window."""
+        merged = cls()
+        parts = list(parts)
+        if parts:
+            merged.started_at = min(part.started_at for part in parts)
+        for part in parts:
+            merged.rows.extend(part.rows)
+            for phase in PHASES:
+                merged.samples[phase].extend(part.samples[phase])
+        merged.rows.sort(key=lambda row: row.get("started", 0.0))
+        return merged
+
+    def summary(self):
+        """{phase: {count, total, mean, p50, p90, p99, max, histogram}} for phases with samples."""
+        result = {}
+        for phase in PHASES:
+            samples = self.samples[phase]
+            if not samples:
+                continue
+            result[phase] = {
+                "count": len(samples),
+                "total": round(sum(samples), 3),
+                "mean": round(sum(samples) / len(samples), 4),
+                "p50": round(percentile(samples, 50), 4),
+                "p90": round(percentile(samples, 90), 4),
+                "p99": round(percentile(samples, 99), 4),
+                "max": round(max(samples), 4),
+                "histogram": histogram(samples),
+            }
+        return result
+
+    def describe(self):
+        """Log lines: one per phase, sorted by total time spent."""
+        summary = self.summary()
+        if not summary:
+            return []
+        lines = ["\n>>> TIMING BY PHASE (total | p50 | p90 | max)"]
+        for phase, stats in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            lines.append(f"  {phase:<15} {stats['total']:>8.1f}s | {stats['p50']:.2f}s | "
+                         f"{stats['p90']:.2f}s | {stats['max']:.2f}s  (n={stats['count']})")
+        return lines
+
+    def export(self, folder, name=None):
+        """Writes <name>.json (summary + rows) and <name>.csv (one row per date). Returns both paths."""
+        os.makedirs(folder, exist_ok=True)
+        name = name or time.strftime("run_%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        json_path = os.path.join(folder, name + ".json")
+        csv_path = os.path.join(folder, name + ".csv")
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"started_at": self.started_at, "phases": self.summary(), "dates": self.rows}, f, indent=1)
+
+        fields = ["contract", "date", "outcome", "landed", "total"] + [p for p in PHASES if p not in ("find_controls", "set_instrument")]
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for row in self.rows:
+                writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+        return json_path, csv_path
@@ -1,23 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
-import time
-from datetime import timedelta, date
-import os
-import re
-from contract_utils import get_active_trading_period, get_previous_contract, get_contract_expiry
-from PIL import Image, ImageTk 
 
 # pywinauto imports
 from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
 
-import pyautogui # Added back for robust popup handling
-
-import ctypes
+from batch_queue import BatchJob, BatchQueue, BatchRunner, JOB_PAUSED
+from image_cache import get_resized_image, get_resource_path
+from log_view import LogView
+from mining_engine import MiningConfig
+from mining_events import EventBus, EventQueue, LogMessage, Progress, WorkerStopped
+from nt8_driver import create_window_drivers
+from parallel_miner import create_miner
 
 # Professional Trading Terminal Color Scheme (Kept from V1)
 VERSION = "2.05"
+INSTRUCTIONS_WIDTH = 1130
+EVENT_FRAME_MS = 100  # GUI refresh rate for worker progress (10 fps)
 
 COLORS = {
     'bg_dark': '#0a1612',
@@ -52,8 +51,6 @@ class TradingTerminalGUI:
                        foreground=COLORS['text_primary'],
                        arrowcolor=COLORS['accent_green'])
         
-        self.existing_dates = set()
-        
         # === HEADER ===
         header = tk.Frame(root, bg=COLORS['bg_medium'], height=60)
         header.pack(fill="x", padx=0, pady=0)
@@ -68,22 +65,8 @@ class TradingTerminalGUI:
         self.instr_canvas = tk.Canvas(root, bg=COLORS['bg_panel'], height=canvas_height, highlightthickness=0)
         self.instr_canvas.pack(fill="x", padx=10, pady=(10, 5))
         
+        # Image is loaded after the first paint (see _on_instructions_mapped)
         self.photo = None
-        try:
-            img_path = "helper_preview.png"
-            if os.path.exists(img_path):
-                raw_img = Image.open(img_path)
-                target_width = 1130
-                w_percent = (target_width / float(raw_img.size[0]))
-                h_size = int((float(raw_img.size[1]) * float(w_percent)))
-                if h_size > canvas_height:
-                    self.instr_canvas.config(height=h_size)
-                    canvas_height = h_size
-                raw_img = raw_img.resize((target_width, h_size), Image.Resampling.LANCZOS)
-                self.photo = ImageTk.PhotoImage(raw_img)
-                self.instr_canvas.create_image(0, 0, image=self.photo, anchor="nw")
-        except Exception as e:
-            print(f"Could not load image: {e}")
 
         # === MAIN CONTAINER ===
         main_container = tk.Frame(root, bg=COLORS['bg_dark'])
@@ -115,6 +98,9 @@ class TradingTerminalGUI:
         self.mining_mode = tk.StringVar(value="deep")
         tk.Radiobutton(mode_frame, text="Deep History", variable=self.mining_mode, value="deep", font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left")
         tk.Radiobutton(mode_frame, text="Single Contract", variable=self.mining_mode, value="single", font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left")
+        tk.Radiobutton(mode_frame, text="Top-Up", variable=self.mining_mode, value="topup", font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left")
+        self.front_month_only = tk.BooleanVar(value=False)
+        tk.Checkbutton(mode_frame, text="Front month only", variable=self.front_month_only, font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left", padx=(10, 0))
 
         # Depth
         tk.Label(grid_frame, text="Depth:", font=("Consolas", 9, "bold"), bg=COLORS['bg_panel'], fg=COLORS['text_secondary'], anchor="e").grid(row=2, column=0, sticky="e", padx=5, pady=8)
@@ -126,13 +112,34 @@ class TradingTerminalGUI:
         tk.Label(depth_frame, text="contracts back", bg=COLORS['bg_panel'], fg=COLORS['text_muted'], font=("Consolas", 8)).pack(side="left", padx=5)
 
         # Stop Loss
-        tk.Label(grid_frame, text="Stop after X failures:", font=("Consolas", 9, "bold"), bg=COLORS['bg_panel'], fg=COLORS['text_secondary'], anchor="e").grid(row=3, column=0, sticky="e", padx=5, pady=8)
+        tk.Label(grid_frame, text="Stop after X No Data:", font=("Consolas", 9, "bold"), bg=COLORS['bg_panel'], fg=COLORS['text_secondary'], anchor="e").grid(row=3, column=0, sticky="e", padx=5, pady=8)
         stop_frame = tk.Frame(grid_frame, bg=COLORS['bg_panel'])
         stop_frame.grid(row=3, column=1, sticky="w", padx=5, pady=8)
         self.stop_loss_spin = tk.Spinbox(stop_frame, from_=3, to=30, width=5, font=("Consolas", 10))
         self.stop_loss_spin.delete(0, tk.END); self.stop_loss_spin.insert(0, "5")
         self.stop_loss_spin.pack(side="left")
 
+        # History Search
+        tk.Label(grid_frame, text="History Search:", font=("Consolas", 9, "bold"), bg=COLORS['bg_panel'], fg=COLORS['text_secondary'], anchor="e").grid(row=4, column=0, sticky="e", padx=5, pady=8)
+        search_frame = tk.Frame(grid_frame, bg=COLORS['bg_panel'])
+        search_frame.grid(row=4, column=1, sticky="w", padx=5, pady=8)
+        self.search_mode = tk.StringVar(value="walk")
+        tk.Radiobutton(search_frame, text="Linear", variable=self.search_mode, value="walk", font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left")
+        tk.Radiobutton(search_frame, text="Binary", variable=self.search_mode, value="boundary", font=("Consolas", 9), bg=COLORS['bg_panel'], fg=COLORS['text_primary'], selectcolor=COLORS['bg_dark'], activebackground=COLORS['bg_panel'], activeforeground=COLORS['accent_green']).pack(side="left")
+
+        # === BATCH QUEUE ===
+        batch_title = tk.Label(left_panel, text="BATCH QUEUE", font=("Consolas", 11, "bold"), bg=COLORS['bg_panel'], fg=COLORS['accent_gold'], anchor="w")
+        batch_title.pack(fill="x", padx=15, pady=(15, 5))
+        self.batch_list = tk.Listbox(left_panel, height=7, font=("Consolas", 9), bg=COLORS['bg_dark'], fg=COLORS['text_primary'], selectbackground=COLORS['button_bg'], highlightthickness=0)
+        self.batch_list.pack(fill="x", padx=15)
+        batch_btns = tk.Frame(left_panel, bg=COLORS['bg_panel'])
+        batch_btns.pack(fill="x", padx=15, pady=(5, 15))
+        for text, command in (("+ ADD", self.batch_add), ("− DEL", self.batch_remove), ("▲", lambda: self.batch_move(-1)), ("▼", lambda: self.batch_move(1)), ("⏸/▶", self.batch_toggle_pause)):
+            tk.Button(batch_btns, text=text, command=command, font=("Consolas", 8, "bold"), bg=COLORS['bg_dark'], fg=COLORS['text_secondary'], relief="raised", bd=2).pack(side="left", padx=1)
+        self.batch_dirty = False
+        self.batch_queue = BatchQueue(on_change=self._mark_batch_dirty)
+        self.runner = None
+
         # === RIGHT PANEL: Log ===
         right_panel = tk.Frame(main_container, bg=COLORS['bg_panel'])
         right_panel.pack(side="right", fill="both", expand=True, padx=(5, 0), pady=0)
@@ -142,6 +149,14 @@ class TradingTerminalGUI:
         
         self.log = scrolledtext.ScrolledText(right_panel, height=20, font=("Consolas", 9), bg=COLORS['bg_dark'], fg=COLORS['accent_green'], state="disabled")
         self.log.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        self.log_view = LogView(root, self.log)
+        self.log_view.start()
+
+        # Worker -> GUI event stream (log lines go straight to the log view's queue)
+        self.events = EventBus()
+        self.events.subscribe(lambda e: self.log_view.push(e.text), [LogMessage])
+        self.event_queue = EventQueue()
+        self.events.subscribe(self.event_queue, [Progress, WorkerStopped])
 
         # === CONTROL PANEL ===
         control_panel = tk.Frame(root, bg=COLORS['bg_medium'], height=80)
@@ -166,7 +181,27 @@ class TradingTerminalGUI:
 
         self.is_running = False
         self.stop_requested = False
+        self.engine = None
         self.desktop = Desktop(backend="uia")
+        self.root.after(EVENT_FRAME_MS, self._pump_events)
+        self.instr_canvas.bind("<Map>", self._on_instructions_mapped)
+
+    def _on_instructions_mapped(self, event):
+        """One-shot on first map: an idle callback queued now runs after the first redraw (a timer might not)."""
+        self.instr_canvas.unbind("<Map>")
+        self.root.after_idle(self._load_instructions)
+
+    def _load_instructions(self):
+        """Shows the instructions image from the on-disk resize cache (PIL only runs on a cache miss)."""
+        try:
+            img_path = get_resized_image(get_resource_path("helper_preview.png"), INSTRUCTIONS_WIDTH)
+            if img_path:
+                self.photo = tk.PhotoImage(file=img_path)
+                if self.photo.height() > int(self.instr_canvas.cget("height")):
+                    self.instr_canvas.config(height=self.photo.height())
+                self.instr_canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        except Exception as e:
+            print(f"Could not load image: {e}")
 
     def _get_contracts(self):
         contracts = [
@@ -179,283 +214,139 @@ class TradingTerminalGUI:
     def _create_action_button(self, parent, text, command, fg_color):
         return tk.Button(parent, text=text, command=command, font=("Consolas", 10, "bold"), bg=COLORS['bg_dark'], fg=fg_color, relief="raised", bd=3, width=15, height=1)
 
+    def _mark_batch_dirty(self):
+        # May run on the worker thread; the list is redrawn by _pump_events
+        self.batch_dirty = True
+
+    def _refresh_batch_list(self):
+        selection = self.batch_list.curselection()
+        self.batch_list.delete(0, tk.END)
+        for job in self.batch_queue.jobs():
+            self.batch_list.insert(tk.END, job.describe())
+        if selection:
+            self.batch_list.selection_set(selection[0])
+
+    def _selected_job(self):
+        selection = self.batch_list.curselection()
+        jobs = self.batch_queue.jobs()
+        if not selection or selection[0] >= len(jobs):
+            return None
+        return jobs[selection[0]]
+
+    def batch_add(self):
+        """Queues the current configuration as a batch job."""
+        try: depth = int(self.contracts_back_spin.get())
+        except: depth = 4
+        try: stop_loss_limit = int(self.stop_loss_spin.get())
+        except: stop_loss_limit = 5
+        try:
+            job = BatchJob(self.inst_combo.get(), depth=depth, mode=self.mining_mode.get(),
+                           search_mode=self.search_mode.get(), stop_loss_limit=stop_loss_limit)
+        except ValueError as e:
+            messagebox.showerror("Invalid Contract", str(e))
+            return
+        self.batch_queue.add(job)
+
+    def batch_remove(self):
+        job = self._selected_job()
+        if job:
+            self.batch_queue.remove(job.id)
+
+    def batch_move(self, offset):
+        job = self._selected_job()
+        if job and self.batch_queue.move(job.id, offset):
+            index = self.batch_queue.jobs().index(job)
+            self.batch_list.selection_clear(0, tk.END)
+            self.batch_list.selection_set(index)
+
+    def batch_toggle_pause(self):
+        job = self._selected_job()
+        if not job:
+            return
+        if job.status == JOB_PAUSED:
+            self.batch_queue.resume(job.id)
+        elif self.runner:
+            self.runner.pause(job.id)
+        else:
+            self.batch_queue.pause(job.id)
+
     def write_log(self, msg):
-        def _write():
-            self.log.config(state="normal")
-            self.log.insert(tk.END, f"{msg}\n")
-            self.log.see(tk.END)
-            self.log.config(state="disabled")
-        self.root.after(0, _write)
+        self.log_view.push(msg)
 
     def start_download(self):
+        # Read every widget here, on the Tk thread; the worker never touches Tk
+        try: max_contracts_back = int(self.contracts_back_spin.get())
+        except: max_contracts_back = 4
+        try: stop_loss_limit = int(self.stop_loss_spin.get())
+        except: stop_loss_limit = 5
+
+        config = MiningConfig(self.inst_combo.get(),
+                              max_contracts_back=max_contracts_back,
+                              stop_loss_limit=stop_loss_limit,
+                              mode=self.mining_mode.get(),
+                              search_mode=self.search_mode.get())
+        config.front_month_only = self.front_month_only.get()
+
         self.is_running = True
         self.stop_requested = False
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
-        threading.Thread(target=self.mining_worker, daemon=True).start()
+        threading.Thread(target=self.mining_worker, args=(config,), daemon=True).start()
 
     def stop_download(self):
         self.write_log("\n! STOP REQUESTED")
         self.stop_requested = True
+        if self.runner:
+            self.runner.stop()
+        if self.engine:
+            self.engine.stop()
 
-    def _find_controls(self):
-        """Locate NT8 controls using pywinauto"""
-        try:
-            window = self.desktop.window(title_re="^Historical Data.*")
-            if not window.exists():
-                return None, None, None
-            
-            # Find Edits
-            edits = window.descendants(control_type="Edit")
-            inst_edit = None
-            date_edits = []
-            
-            date_pattern = re.compile(r'\d{1,2}/\d{1,2}/\d{4}')
-            
-            for edit in edits:
-                text = edit.window_text()
-                # Simple heuristic: if it looks like a date, it's a date field
-                if date_pattern.search(text):
-                    date_edits.append(edit)
-                else:
-                    # If it's valid instrument text or just the first non-date edit
-                    if not inst_edit: 
-                        inst_edit = edit
-            
-            # Find Download Button
-            try:
-                dl_btn = window.child_window(title="Download", control_type="Button")
-            except:
-                dl_btn = None
-                
-            return window, inst_edit, date_edits, dl_btn
-        except Exception as e:
-            self.write_log(f"Control search error: {e}")
-            return None, None, None, None
+    def _pump_events(self):
+        """Consumes the worker's event stream at a fixed frame rate; only the latest progress is drawn."""
+        if self.batch_dirty:
+            self.batch_dirty = False
+            self._refresh_batch_list()
+        for event in self.event_queue.drain():
+            if isinstance(event, Progress):
+                self.progress_label.config(text=event.text)
+            elif isinstance(event, WorkerStopped):
+                self.runner = None
+                self.engine = None
+                self.start_btn.config(state="normal")
+                self.stop_btn.config(state="disabled")
+                self.is_running = False
+                if event.error:
+                    messagebox.showerror("Crash Detected", f"An error occurred:\n{event.error}")
+        self.root.after(EVENT_FRAME_MS, self._pump_events)
 
-    def _check_error_popup(self):
-        """Checks if the FOREGROUND window is an error popup and closes it."""
-        try:
-            # Low-level approach: What is the user actually looking at?
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
-            buff = ctypes.create_unicode_buffer(length + 1)
-            ctypes.windll.user32.GetWindowTextW(hwnd, buff, length + 1)
-            title = buff.value
-            
-            # If the active window is the Error popup, nuke it.
-            # Usually "Error" or "NinjaTrader"
-            if title == "Error" or title == "NinjaTrader":
-                
-                # Check for "Historical Data" title to AVOID killing main window
-                if "Historical Data" in title:
-                    return False
-                
-                self.write_log(f"  ⚠ Active Popup detected: '{title}'. DISMISSING.")
-                
-                # Active window is the popup. Just press Enter.
-                time.sleep(0.1) 
-                pyautogui.press('enter')
-                time.sleep(0.1)
-                
-                # Verify it's gone. If not, ESC.
-                hwnd_new = ctypes.windll.user32.GetForegroundWindow()
-                if hwnd == hwnd_new:
-                     pyautogui.press('escape')
-                
-                return True
-                
-        except Exception as e:
-            pass
-        return False
-
-    def mining_worker(self):
+    def mining_worker(self, config):
+        error = details = None
         try:
             if self.stop_requested: return
-            
-            # Configuration
-            try: max_contracts_back = int(self.contracts_back_spin.get())
-            except: max_contracts_back = 4
-            try: stop_loss_limit = int(self.stop_loss_spin.get())
-            except: stop_loss_limit = 5
-            
-            current_contract = self.inst_combo.get().strip()
-            contracts_processed = 0
-            
-            self.write_log(f"\n{'='*50}")
-            self.write_log("⚡ STARTING DEEP HISTORY MINE (V2 AUTO) ⚡")
-            
-            while contracts_processed <= max_contracts_back and not self.stop_requested:
-                self.write_log(f"\n>>> PROCESSING CONTRACT: {current_contract}")
-                
-                # Verify Window Connection
-                window, inst_edit, date_edits, dl_btn = self._find_controls()
-                if not window:
-                    self.write_log("ERROR: Historical Data window not found!")
-                    break
-                if not inst_edit or not dl_btn:
-                    self.write_log("ERROR: Could not find Instrument input or Download button.")
-                    break
-                
-                # Bring to front once
-                try: window.set_focus()
-                except: pass
-                
-                # Set Instrument
-                self.write_log(f"Setting Instrument: {current_contract}")
-                inst_edit.set_edit_text(current_contract)
-                time.sleep(0.5)
-
-                # Determine Start Date
-                if contracts_processed == 0:
-                    start_date = date.today() - timedelta(days=1)
-                else:
-                    start_date = get_contract_expiry(current_contract)
-                
-                current_date = start_date
-                consecutive_misses = 0
-                downloaded_count = 0
-                
-                self.write_log(f"Mining backwards from: {current_date}")
-                
-                while consecutive_misses < stop_loss_limit and not self.stop_requested:
-                    if current_date.weekday() == 5: # Skip Saturday
-                        current_date -= timedelta(days=1)
-                        continue
-                    
-                    date_str = current_date.strftime("%m/%d/%Y")
-                    self.write_log(f"Checking {date_str}...")
-                    
-                    # === SCAN EXISTING DATA FIRST ===
-                    year = current_date.year
-                    month = str(current_date.month).zfill(2)
-                    day = str(current_date.day).zfill(2)
-                    expected_filename = f"{year}{month}{day}.nrd"
-                    docs_path = os.path.join(os.path.expanduser("~"), "Documents")
-                    replay_path = os.path.join(docs_path, "NinjaTrader 8", "db", "replay", current_contract, expected_filename)
-                    
-                    if os.path.exists(replay_path):
-                        self.write_log(f"  ✓ Already Exists (Skip)")
-                        downloaded_count += 1
-                        current_date -= timedelta(days=1)
-                        self.progress_label.config(text=f"Total: {downloaded_count} | Streak: {consecutive_misses}")
-                        continue
-                    
-                    # Set Date
-                    for de in date_edits:
-                        try: de.set_edit_text(date_str)
-                        except: pass
-                    
-                    # === ROBUST BUTTON CLICK & REACTION CHECK ===
-                    
-                    # 1. Wait until button is enabled
-                    wait_ready = 0
-                    while not dl_btn.is_enabled() and wait_ready < 5:
-                        # Also check for popup here, in case previous one lingered?
-                        if self._check_error_popup(): 
-                            self.write_log("  (Cleared lingering popup)")
-                        
-                        time.sleep(0.5)
-                        wait_ready += 0.5
-                    
-                    # 2. Click Download
-                    try:
-                        if dl_btn.is_enabled():
-                            dl_btn.click()
-                        else:
-                            self.write_log("Warning: Button disabled, attempting invoke...")
-                            dl_btn.invoke()
-                    except Exception as e:
-                        self.write_log(f"Click Exception: {e}")
-
-                    # 3. POLL FOR OUTCOME (Critical Phase)
-                    # We expect either:
-                    # A) Button Disables (Download Started) -> Good
-                    # B) Error Popup Appears (No Data) -> Bad/Miss
-                    # C) Nothing happens (Timeout) -> Bad
-                    
-                    outcome = "unknown"
-                    poll_duration = 0
-                    while poll_duration < 3.0:
-                        # Check Error
-                        if self._check_error_popup():
-                            outcome = "error"
-                            break
-                        
-                        # Check Button State (Disabled = Started)
-                        if not dl_btn.is_enabled():
-                            outcome = "started"
-                            break
-                            
-                        time.sleep(0.1)
-                        poll_duration += 0.1
-                        
-                    if outcome == "error":
-                        consecutive_misses += 1
-                        self.progress_label.config(text=f"Total: {downloaded_count} | Streak: {consecutive_misses} (Error Popup)")
-                        # We handled the popup inside _check_error_popup
-                        
-                    elif outcome == "started":
-                        # 4. Wait for download to finish (Button becomes Enabled again)
-                        wait_download = 0
-                        while not dl_btn.is_enabled():
-                            if self.stop_requested: break
-                            
-                            # Just in case an error pops up LATE (weird, but possible)
-                            if self._check_error_popup():
-                                outcome = "error_late"
-                                break
-                                
-                            time.sleep(0.5)
-                            wait_download += 0.5
-                            if wait_download > 300: # 5 minutes max
-                                self.write_log(f"Timeout waiting for download finish (> 5m)")
-                                break
-                        
-                        if outcome == "error_late":
-                            consecutive_misses += 1
-                            self.progress_label.config(text=f"Total: {downloaded_count} | Streak: {consecutive_misses} (Late Error)")
-                        else:
-                            # Success!
-                            self.write_log(f"  ✓ SUCCESS")
-                            consecutive_misses = 0 
-                            downloaded_count += 1
-                            time.sleep(1.0) # Throttle as requested
-                            
-                    else:
-                        # Timeout / Unknown state
-                        self.write_log("  ? No reaction from button/app.")
-                        # Could be instant download? Check file
-                        time.sleep(0.5)
-                        if os.path.exists(replay_path):
-                            self.write_log("  (File found despite no UI reaction)")
-                            downloaded_count += 1
-                            consecutive_misses = 0
-                        else:
-                            consecutive_misses += 1
-
-                    current_date -= timedelta(days=1)
-                    self.progress_label.config(text=f"Total: {downloaded_count} | Streak: {consecutive_misses}")
-
-                self.write_log(f"Finished {current_contract}. Downloaded: {downloaded_count}")
-                
-                if self.mining_mode.get() == "single":
-                    break
-                    
-                current_contract = get_previous_contract(current_contract)
-                contracts_processed += 1
-                
-            self.write_log("\n✓ MINING COMPLETE")
+
+            # Every open Historical Data window works the same queue
+            drivers = create_window_drivers(self.desktop)
+            if len(drivers) > 1:
+                self.write_log(f"Found {len(drivers)} Historical Data windows")
+
+            # Queued jobs run back to back on the same hooked window(s)
+            if self.batch_queue.has_pending():
+                self.runner = BatchRunner(self.batch_queue, drivers, events=self.events,
+                                          config_overrides={"front_month_only": config.front_month_only})
+                self.runner.run()
+                return
+
+            self.engine = create_miner(config, drivers, events=self.events)
+            self.engine.run()
 
         except Exception as e:
-            self.write_log(f"CRITICAL CRASH: {e}")
+            error = e
             import traceback
-            self.write_log(traceback.format_exc())
-            messagebox.showerror("Crash Detected", f"An error occurred:\n{e}")
+            details = traceback.format_exc()
+            self.write_log(f"CRITICAL CRASH: {e}")
+            self.write_log(details)
         finally:
-            self.start_btn.config(state="normal")
-            self.stop_btn.config(state="disabled")
-            self.is_running = False
+            self.events.publish(WorkerStopped(error, details))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# The modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mining_engine import MiningConfig  # noqa: E402
+from nt8_simulator import Latency, SimulatedHistoricalData  # noqa: E402
+
+FAST_TIMINGS = dict(settle_delay=0.0, ready_timeout=0.5, ready_poll=0.001, outcome_timeout=1.0,
+                    outcome_poll=0.001, download_poll=0.001, throttle=0.0, recheck_delay=0.0,
+                    stall_timeout=1.0, retry_base_delay=0.0, retry_max_delay=0.0)
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """MiningConfig on a temp replay tree, no ledger/metrics/profile and near-zero waits."""
+    def make(contract="ES 03-26", **overrides):
+        config = MiningConfig(contract, replay_root=str(tmp_path / "replay"), start_date=date(2026, 1, 16),
+                              ledger_path="")
+        config.metrics_dir = ""
+        config.profile = None
+        config.manifest_dir = str(tmp_path / "manifests")
+        for name, value in dict(FAST_TIMINGS, **overrides).items():
+            setattr(config, name, value)
+        return config
+    return make
+
+
+@pytest.fixture
+def make_simulator():
+    def make(config, **options):
+        options.setdefault("reaction", Latency(0.001, 0))
+        options.setdefault("download", Latency(0.002, 0))
+        options.setdefault("seed", 1)
+        return SimulatedHistoricalData(config.replay_root, **options)
+    return make
+
+
+def touch_replay(root, contract, day):
+    """Creates a .nrd file for (contract, day) under root."""
+    folder = os.path.join(root, contract)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f"{day:%Y%m%d}.nrd"), "wb") as f:
+        f.write(b"N" * 1000)
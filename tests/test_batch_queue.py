@@ -0,0 +1,22 @@
+from batch_queue import JOB_FAILED, JOB_PENDING, BatchJob, BatchQueue, BatchRunner
+
+
+class VanishingWindowDriver:
+    def connect(self):
+        return None
+
+    def set_instrument(self, contract):
+        raise RuntimeError("Historical Data window not found!")
+
+
+def test_engine_exception_fails_the_job(tmp_path):
+    queue = BatchQueue()
+    failing = queue.add(BatchJob("ES 03-26", mode="single"))
+    waiting = queue.add(BatchJob("NQ 03-26", mode="single"))
+    overrides = dict(replay_root=str(tmp_path), ledger_path="", metrics_dir="", profile=None)
+
+    BatchRunner(queue, VanishingWindowDriver(), config_overrides=overrides).run()
+    assert failing.status == JOB_FAILED
+    assert failing.summary["error"] == "Historical Data window not found!"
+    assert waiting.status == JOB_PENDING
+    assert queue.remove(failing.id)
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+import pytest
+
+from contract_utils import (get_active_trading_period, get_contract_expiry, get_front_contract,
+                            get_front_month_period, get_previous_contract, get_roll_date, parse_nt8_contract)
+
+
+def test_parse_contract():
+    assert parse_nt8_contract("MNQ 09-25") == ("MNQ", 9, 2025)
+    with pytest.raises(ValueError):
+        parse_nt8_contract("MNQ")
+    with pytest.raises(ValueError):
+        parse_nt8_contract("MNQ SEP-25")
+
+
+@pytest.mark.parametrize("contract, previous", [
+    ("MNQ 03-26", "MNQ 12-25"),   # Quarterly
+    ("CL 03-26", "CL 02-26"),     # Monthly
+    ("CL 01-26", "CL 12-25"),
+    ("GC 04-26", "GC 02-26"),     # Bimonthly
+    ("GC 02-26", "GC 12-25"),
+])
+def test_previous_contract_follows_listing_cycle(contract, previous):
+    assert get_previous_contract(contract) == previous
+
+
+@pytest.mark.parametrize("contract, expiry", [
+    ("ES 03-26", date(2026, 3, 20)),   # Third Friday
+    ("ES 12-25", date(2025, 12, 19)),
+    ("CL 03-26", date(2026, 2, 20)),   # 3 business days before Feb 25
+    ("CL 01-26", date(2025, 12, 19)),  # Dec 25 is a holiday: 4 business days before
+    ("GC 02-26", date(2026, 2, 25)),   # Third last business day of the month
+    ("GC 04-26", date(2026, 4, 28)),
+])
+def test_contract_expiry(contract, expiry):
+    assert get_contract_expiry(contract) == expiry
+
+
+def test_roll_date_uses_spec_offset_or_override():
+    assert get_roll_date("ES 03-26") == date(2026, 3, 12)
+    assert get_roll_date("ES 03-26", roll_offset=0) == date(2026, 3, 20)
+
+
+def test_front_contract_switches_on_roll_date():
+    assert get_front_contract("ES", on=date(2026, 3, 11)) == "ES 03-26"
+    assert get_front_contract("ES", on=date(2026, 3, 12)) == "ES 06-26"
+    assert get_front_contract("CL", on=date(2026, 1, 5)) == "CL 02-26"
+
+
+def test_active_period_runs_between_expiries():
+    assert get_active_trading_period("ES 03-26") == (date(2025, 12, 19), date(2026, 3, 20))
+
+
+@pytest.mark.parametrize("contract", ["ES 03-26", "CL 03-26", "GC 04-26"])
+def test_front_month_windows_tile_the_chain(contract):
+    start, end = get_front_month_period(contract)
+    previous_start, previous_end = get_front_month_period(get_previous_contract(contract))
+    assert previous_end + timedelta(days=1) == start
+    assert get_active_trading_period(contract, front_month=True) == (start, end)
@@ -0,0 +1,40 @@
+import time
+
+from coordinator import Coordinator
+from mining_engine import ATTEMPT_HIT
+
+
+def make_coordinator(make_config, lease_ttl):
+    return Coordinator(make_config(mode="single"), lease_ttl=lease_ttl)
+
+
+def test_expired_lease_is_handed_out_again(make_config):
+    coordinator = make_coordinator(make_config, lease_ttl=0.05)
+    first = coordinator.lease("worker-a")["lease"]
+    time.sleep(0.1)
+
+    second = coordinator.lease("worker-b")["lease"]
+    assert coordinator.status()["results"]["expired"] == 1
+    assert (second["contract"], second["date"], second["attempts"]) == (first["contract"], first["date"], 2)
+    # The late worker can no longer report on the expired lease
+    assert not coordinator.heartbeat("worker-a", first["id"])["ok"]
+    assert not coordinator.complete("worker-a", first["id"], ATTEMPT_HIT)["ok"]
+    assert coordinator.complete("worker-b", second["id"], ATTEMPT_HIT)["ok"]
+
+
+def test_heartbeat_keeps_the_lease(make_config):
+    coordinator = make_coordinator(make_config, lease_ttl=0.2)
+    lease = coordinator.lease("worker-a")["lease"]
+    for _ in range(3):
+        time.sleep(0.1)
+        assert coordinator.heartbeat("worker-a", lease["id"])["ok"]
+    coordinator.expire()
+    assert coordinator.status()["results"]["expired"] == 0
+    assert coordinator.complete("worker-a", lease["id"], ATTEMPT_HIT)["ok"]
+
+
+def test_needed_range_is_leased_next(make_config):
+    coordinator = make_coordinator(make_config, lease_ttl=60)
+    assert coordinator.add_needs(["ES 03-26 2026-01-06"])["ok"]
+    assert coordinator.lease("worker-a")["lease"]["date"] == "2026-01-06"
+    assert not coordinator.add_needs(["nonsense"])["ok"]
@@ -0,0 +1,44 @@
+import json
+import sys
+import types
+
+import miner_cli
+
+
+class ClosedWindowDriver:
+    def __init__(self):
+        raise RuntimeError("Historical Data window not found!")
+
+
+def test_driver_failure_still_prints_the_json_summary(monkeypatch, capsys):
+    backend = types.ModuleType("nt8_driver")
+    backend.NT8WindowDriver = ClosedWindowDriver
+    backend.create_window_drivers = lambda: [ClosedWindowDriver()]
+    monkeypatch.setitem(sys.modules, "nt8_driver", backend)
+
+    assert miner_cli.main(["--contract", "ES 03-26", "--single-window", "--quiet"]) == miner_cli.EXIT_ERROR
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["status"] == "error"
+    assert summary["error"] == "Historical Data window not found!"
+
+
+class VanishingWindowDriver:
+    def connect(self):
+        return None
+
+    def set_instrument(self, contract):
+        raise RuntimeError("Historical Data window not found!")
+
+
+def test_engine_failure_still_prints_the_json_summary(monkeypatch, capsys, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    backend = types.ModuleType("nt8_driver")
+    backend.NT8WindowDriver = VanishingWindowDriver
+    backend.create_window_drivers = lambda: [VanishingWindowDriver()]
+    monkeypatch.setitem(sys.modules, "nt8_driver", backend)
+
+    argv = ["--contract", "ES 03-26", "--mode", "single", "--single-window", "--quiet",
+            "--replay-root", str(tmp_path / "replay"), "--ledger", ""]
+    assert miner_cli.main(argv) == miner_cli.EXIT_ERROR
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["status"], summary["error"]) == ("error", "Historical Data window not found!")
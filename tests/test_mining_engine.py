@@ -0,0 +1,140 @@
+import os
+from datetime import date
+
+from conftest import touch_replay
+from mining_engine import (ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_TRANSIENT, STATE_BUSY, MiningEngine,
+                           ReplayDriver)
+from mining_plan import session_dates
+
+FIRST_AVAILABLE = date(2026, 1, 5)
+HOLE = date(2026, 1, 13)
+
+
+class BusyDriver(ReplayDriver):
+    """The Download button disables on every click and never comes back; nothing is written."""
+
+    def connect(self):
+        return None
+
+    def set_instrument(self, contract):
+        pass
+
+    def set_date(self, day):
+        pass
+
+    def click_download(self):
+        pass
+
+    def poll_state(self):
+        return STATE_BUSY
+
+    def dismiss_popup(self):
+        return None
+
+
+def expected_files():
+    return set(session_dates(FIRST_AVAILABLE, date(2026, 1, 16), "ES")) - {HOLE}
+
+
+def mine(make_config, make_simulator, search_mode):
+    config = make_config(mode="single", search_mode=search_mode)
+    sim = make_simulator(config, first_available=FIRST_AVAILABLE, no_data_dates={HOLE})
+    engine = MiningEngine(config, sim)
+    summary = engine.run()
+    return engine, summary
+
+
+def test_walk_fills_the_contract(make_config, make_simulator):
+    engine, summary = mine(make_config, make_simulator, "walk")
+    assert engine.index.dates("ES 03-26") == expected_files()
+    assert summary["downloaded"] == len(expected_files())
+
+
+def test_boundary_search_steps_over_a_one_day_hole(make_config, make_simulator):
+    engine, summary = mine(make_config, make_simulator, "boundary")
+    assert engine.index.dates("ES 03-26") == expected_files()
+    assert summary["downloaded"] == len(expected_files())
+
+
+def test_boundary_search_wastes_fewer_attempts_than_the_walk(make_config, make_simulator):
+    wasted = {}
+    for search_mode in ("walk", "boundary"):
+        config = make_config(search_mode=search_mode, max_contracts_back=2)
+        sim = make_simulator(config, first_available=date(2025, 10, 1), no_data_dates={HOLE})
+        summary = MiningEngine(config, sim).run()
+        wasted[search_mode] = sim.stats["clicks"] - summary["downloaded"]
+    assert wasted["boundary"] < wasted["walk"]
+
+
+def test_attempt_results(make_config, make_simulator):
+    config = make_config(mode="single")
+    engine = MiningEngine(config, make_simulator(config, no_data_dates={HOLE}))
+    engine.select_contract("ES 03-26")
+    assert engine.attempt_date("ES 03-26", date(2026, 1, 15)) == ATTEMPT_HIT
+    assert engine.attempt_date("ES 03-26", HOLE) == ATTEMPT_NO_DATA
+
+
+def test_download_that_never_writes_is_transient(make_config):
+    config = make_config(mode="single", stall_timeout=0.05)
+    engine = MiningEngine(config, BusyDriver())
+    engine.select_contract("ES 03-26")
+    assert engine.attempt_date("ES 03-26", date(2026, 1, 15)) == ATTEMPT_TRANSIENT
+    assert not engine.index.has("ES 03-26", date(2026, 1, 15))
+    assert engine.downloaded_count == 0
+
+
+def test_stalled_transfers_are_retried(make_config, make_simulator):
+    config = make_config(mode="single", stall_timeout=0.05)
+    sim = make_simulator(config, first_available=FIRST_AVAILABLE, stall_rate=0.3, seed=3)
+    engine = MiningEngine(config, sim)
+    engine.run()
+    assert sim.stats["stalls"]
+    assert engine.index.dates("ES 03-26") == set(session_dates(FIRST_AVAILABLE, date(2026, 1, 16), "ES"))
+
+
+def test_suspect_file_is_not_taken_for_a_repair(make_config, make_simulator):
+    config = make_config(mode="single", verify_files=True, transient_limit=100, outcome_timeout=0.005,
+                         retry_attempts=1)
+    folder = os.path.join(config.replay_root, "ES 03-26")
+    os.makedirs(folder)
+    open(os.path.join(folder, "20260108.nrd"), "wb").close()  # Truncated by a killed download
+
+    summary = MiningEngine(config, make_simulator(config, no_reaction_rate=1.0)).run()
+    assert summary["downloaded"] == 0
+    assert os.listdir(folder) == ["20260108.nrd.bad"]
+
+
+def test_partial_file_from_an_earlier_attempt_is_not_a_hit(make_config, make_simulator):
+    config = make_config(mode="single", outcome_timeout=0.005)
+    engine = MiningEngine(config, make_simulator(config, no_reaction_rate=1.0))
+    engine.select_contract("ES 03-26")
+    touch_replay(config.replay_root, "ES 03-26", date(2026, 1, 15))  # Left behind by a stall
+    assert engine.attempt_date("ES 03-26", date(2026, 1, 15)) == ATTEMPT_TRANSIENT
+    assert engine.downloaded_count == 0
+
+
+def test_stall_leaves_no_partial_file(make_config, make_simulator):
+    config = make_config(mode="single", stall_timeout=0.05)
+    engine = MiningEngine(config, make_simulator(config, stall_rate=1.0))
+    engine.select_contract("ES 03-26")
+    assert engine.attempt_date("ES 03-26", date(2026, 1, 15)) == ATTEMPT_TRANSIENT
+    assert os.listdir(os.path.join(config.replay_root, "ES 03-26")) == ["20260115.nrd.bad"]
+
+
+def test_date_field_failure_defers_the_date(make_config, make_simulator):
+    config = make_config(mode="single")
+    sim = make_simulator(config, first_available=FIRST_AVAILABLE)
+    glitches = [date(2026, 1, 15)]
+    set_date = sim.set_date
+
+    def glitching_set_date(day):
+        if day in glitches:
+            glitches.remove(day)
+            raise RuntimeError("Date field shows '' instead of 01/15/2026")
+        set_date(day)
+
+    sim.set_date = glitching_set_date
+    engine = MiningEngine(config, sim)
+    summary = engine.run()
+    assert summary["downloaded"] == len(session_dates(FIRST_AVAILABLE, date(2026, 1, 16), "ES"))
+    assert engine.index.has("ES 03-26", date(2026, 1, 15))
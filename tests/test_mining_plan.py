@@ -0,0 +1,88 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from conftest import touch_replay
+from mining_plan import build_plan, get_contract_chain, session_dates
+from replay_index import ReplayIndex
+from run_ledger import RESULT_NO_DATA, RunLedger
+
+
+def test_contract_chain():
+    assert get_contract_chain("ES 03-26", 2) == ["ES 03-26", "ES 12-25", "ES 09-25"]
+    assert get_contract_chain("ES 03-26", 2, mode="single") == ["ES 03-26"]
+
+
+def test_session_dates_newest_first_without_saturdays_and_holidays():
+    days = session_dates(date(2025, 12, 22), date(2025, 12, 28), "ES")
+    assert days == [date(2025, 12, 28), date(2025, 12, 26), date(2025, 12, 24),
+                    date(2025, 12, 23), date(2025, 12, 22)]
+
+
+def test_plan_skips_files_on_disk(make_config):
+    config = make_config(mode="single")
+    touch_replay(config.replay_root, "ES 03-26", date(2026, 1, 15))
+    plan = build_plan(config, ReplayIndex(config.replay_root))
+
+    assert len(plan) == 1
+    cp = plan[0]
+    assert (cp.start, cp.end) == (date(2025, 12, 19), date(2026, 1, 16))
+    assert cp.sessions[0] == date(2026, 1, 16)
+    assert date(2026, 1, 15) not in cp.missing
+    assert cp.present == 1
+    assert len(cp.missing) == len(cp.sessions) - 1
+
+
+def test_front_month_plan_gives_each_session_to_one_contract(make_config):
+    config = make_config(max_contracts_back=3)
+    config.front_month_only = True
+    plan = build_plan(config, ReplayIndex(config.replay_root))
+
+    seen = set()
+    for cp in plan:
+        assert not seen & set(cp.sessions)
+        seen |= set(cp.sessions)
+    for newer, older in zip(plan, plan[1:]):
+        assert older.end + timedelta(days=1) == newer.start
+
+
+def test_plan_leaves_out_known_no_data_but_not_fresh_answers(make_config, tmp_path, monkeypatch):
+    config = make_config(mode="single")
+    # Both answers recorded on the morning after the newest session
+    monkeypatch.setattr(time, "time", lambda: datetime(2026, 1, 17, 9, 0).timestamp())
+    ledger = RunLedger(str(tmp_path / "ledger.sqlite3"))
+    ledger.record("ES 03-26", date(2026, 1, 7), RESULT_NO_DATA)
+    ledger.record("ES 03-26", date(2026, 1, 16), RESULT_NO_DATA)  # Maybe just not published yet
+
+    cp = build_plan(config, ReplayIndex(config.replay_root), ledger)[0]
+    assert date(2026, 1, 7) in cp.no_data
+    assert date(2026, 1, 7) not in cp.missing
+    assert date(2026, 1, 16) in cp.missing
+
+
+def test_topup_plan_starts_after_newest_file(make_config):
+    config = make_config(mode="topup", max_contracts_back=2)
+    touch_replay(config.replay_root, "ES 03-26", date(2026, 1, 12))
+    plan = build_plan(config, ReplayIndex(config.replay_root))
+
+    assert [cp.contract for cp in plan] == ["ES 03-26"]
+    assert plan[0].missing == [date(2026, 1, 16), date(2026, 1, 15), date(2026, 1, 14), date(2026, 1, 13)]
+
+
+def test_topup_plan_steps_back_across_the_roll(make_config):
+    config = make_config(mode="topup", max_contracts_back=2)
+    touch_replay(config.replay_root, "ES 12-25", date(2025, 12, 5))
+    plan = build_plan(config, ReplayIndex(config.replay_root))
+
+    assert [cp.contract for cp in plan] == ["ES 03-26", "ES 12-25"]
+    older = plan[1]
+    assert min(older.missing) == date(2025, 12, 7)  # Day after the file (Saturday skipped)
+    assert max(older.missing) == date(2025, 12, 10)  # Day before ES 12-25 rolls
+    assert min(plan[0].missing) == date(2025, 12, 11)
+
+
+def test_topup_plan_with_empty_archive_plans_front_month_only(make_config):
+    config = make_config(mode="topup", max_contracts_back=2)
+    plan = build_plan(config, ReplayIndex(config.replay_root))
+    assert [cp.contract for cp in plan] == ["ES 03-26"]
+    assert not os.path.exists(os.path.join(config.replay_root, "ES 03-26"))
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+from mining_engine import ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_TRANSIENT
+from mining_plan import ContractPlan
+from parallel_miner import DateWorkQueue, ParallelMiner
+from retry_queue import RetryQueue
+from work_priority import PriorityPolicy
+
+NEWEST = date(2026, 1, 16)
+
+
+def make_plan(*contracts, count=10):
+    sessions = [NEWEST - timedelta(days=i) for i in range(count)]
+    return [ContractPlan(c, sessions[-1], sessions[0], sessions, list(sessions), 0) for c in contracts]
+
+
+def make_queue(plan, stop_loss_limit=3, policy=None):
+    return DateWorkQueue(plan, stop_loss_limit, RetryQueue(0.0, 0.0, 3), policy)
+
+
+def take(queue, count):
+    return [queue.next_item(block=False) for _ in range(count)]
+
+
+def test_hands_out_newest_first():
+    queue = make_queue(make_plan("ES 03-26"))
+    assert [item[1] for item in take(queue, 3)] == [NEWEST, NEWEST - timedelta(days=1), NEWEST - timedelta(days=2)]
+
+
+def test_cut_after_stop_loss_streak():
+    queue = make_queue(make_plan("ES 03-26"))
+    items = take(queue, 4)
+    for item, result in zip(items, (ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_NO_DATA, ATTEMPT_NO_DATA)):
+        queue.complete(item, result)
+    assert queue.next_item(block=False) is None
+    assert queue.finished()
+
+
+def test_cut_waits_for_the_in_order_prefix():
+    queue = make_queue(make_plan("ES 03-26"))
+    first, *rest = take(queue, 4)
+    for item in rest:
+        queue.complete(item, ATTEMPT_NO_DATA)
+    assert not queue.finished()
+    assert queue.next_item(block=False) is not None  # The newest date is still open: no cut yet
+
+    queue = make_queue(make_plan("ES 03-26"))
+    first, *rest = take(queue, 4)
+    for item in rest:
+        queue.complete(item, ATTEMPT_NO_DATA)
+    queue.complete(first, ATTEMPT_HIT)
+    assert queue.next_item(block=False) is None
+
+
+def test_hit_resets_the_streak():
+    queue = make_queue(make_plan("ES 03-26"))
+    for result in (ATTEMPT_NO_DATA, ATTEMPT_NO_DATA, ATTEMPT_HIT, ATTEMPT_NO_DATA, ATTEMPT_NO_DATA):
+        queue.complete(queue.next_item(block=False), result)
+    assert queue.next_item(block=False) is not None
+
+
+def test_transient_is_neutral_and_retried():
+    queue = make_queue(make_plan("ES 03-26"))
+    results = (ATTEMPT_NO_DATA, ATTEMPT_TRANSIENT, ATTEMPT_NO_DATA, ATTEMPT_NO_DATA)
+    items = take(queue, 4)
+    for item, result in zip(items, results):
+        queue.complete(item, result)
+    assert not queue.finished()  # The transient date waits for its retry
+    retry = queue.next_item(block=False)
+    assert retry == (items[1][0], items[1][1], 2)
+    queue.complete(retry, ATTEMPT_HIT)
+    assert queue.finished()
+
+
+def test_cut_contract_does_not_stop_the_next_one():
+    queue = make_queue(make_plan("ES 03-26", "ES 12-25"))
+    for _ in range(3):
+        item = queue.next_item("ES 03-26", block=False)
+        assert item[0] == "ES 03-26"
+        queue.complete(item, ATTEMPT_NO_DATA)
+    assert queue.next_item("ES 03-26", block=False)[0] == "ES 12-25"
+
+
+def test_needed_ranges_go_first_and_are_picked_up_live():
+    policy = PriorityPolicy("chain")
+    queue = make_queue(make_plan("ES 03-26", "ES 12-25"), policy=policy)
+    assert queue.next_item(block=False)[:2] == ("ES 03-26", NEWEST)
+    policy.add("ES 12-25", NEWEST - timedelta(days=7))
+    assert queue.next_item(block=False)[:2] == ("ES 12-25", NEWEST - timedelta(days=7))
+    assert queue.next_item(block=False)[:2] == ("ES 03-26", NEWEST - timedelta(days=1))
+
+
+def test_pool_mines_the_chain_and_exports_merged_metrics(make_config, make_simulator, tmp_path):
+    config = make_config(max_contracts_back=1)
+    config.metrics_dir = str(tmp_path / "metrics")
+    drivers = [make_simulator(config, first_available=date(2025, 12, 1), seed=i) for i in range(2)]
+    summary = ParallelMiner(config, drivers).run()
+    assert summary["downloaded"] == sum(w["downloaded"] for w in summary["windows"]) > 0
+    assert all(w["downloaded"] for w in summary["windows"])
+    assert summary["metrics_files"]
@@ -0,0 +1,34 @@
+from datetime import date
+
+from retry_queue import RetryQueue
+
+DAY = date(2026, 1, 15)
+
+
+def test_backoff_doubles_up_to_the_cap():
+    queue = RetryQueue(base_delay=5, max_delay=30, max_attempts=10)
+    assert [queue.delay(n) for n in range(1, 6)] == [5, 10, 20, 30, 30]
+
+
+def test_defer_until_attempts_are_used_up():
+    queue = RetryQueue(base_delay=5, max_delay=60, max_attempts=3)
+    assert queue.defer("ES 03-26", DAY, 1) == 5
+    assert queue.defer("ES 03-26", DAY, 2) == 10
+    assert queue.defer("ES 03-26", DAY, 3) is None
+    assert len(queue) == 2
+
+
+def test_pop_honours_contract_and_due_time():
+    queue = RetryQueue(base_delay=0, max_delay=0, max_attempts=3)
+    queue.defer("ES 03-26", DAY, 1)
+    later = RetryQueue(base_delay=100, max_delay=100, max_attempts=3)
+    later.defer("ES 03-26", DAY, 1)
+
+    assert queue.pending("ES 12-25") == 0
+    assert queue.pop("ES 12-25") is None
+    item = queue.pop("ES 03-26", due_only=True)
+    assert (item.contract, item.day, item.attempts) == ("ES 03-26", DAY, 1)
+    assert not queue
+
+    assert later.pop(due_only=True) is None  # Backoff not over yet
+    assert later.pop() is not None
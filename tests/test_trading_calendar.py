@@ -0,0 +1,43 @@
+from datetime import date
+
+from trading_calendar import get_cme_holidays, get_product_group, is_business_day, is_trading_day
+
+
+def test_product_groups():
+    assert get_product_group("MNQ") == "equity"
+    assert get_product_group("CL") == "energy"
+    assert get_product_group("XYZ") == "equity"  # Unknown symbols trade like equity
+
+
+def test_fixed_and_floating_holidays_2025():
+    holidays = get_cme_holidays(2025)
+    assert date(2025, 1, 20) in holidays    # MLK
+    assert date(2025, 4, 18) in holidays    # Good Friday
+    assert date(2025, 6, 19) in holidays    # Juneteenth
+    assert date(2025, 11, 27) in holidays   # Thanksgiving
+    assert date(2025, 12, 25) in holidays
+
+
+def test_juneteenth_only_from_2022():
+    assert date(2021, 6, 18) not in get_cme_holidays(2021)
+    assert date(2022, 6, 20) in get_cme_holidays(2022)  # Sunday June 19 observed on Monday
+
+
+def test_sunday_christmas_cancels_the_reopen():
+    holidays = get_cme_holidays(2022)
+    assert date(2022, 12, 25) in holidays
+    assert date(2022, 12, 26) in holidays
+
+
+def test_good_friday_payrolls_sessions():
+    good_friday = date(2023, 4, 7)
+    assert is_trading_day(good_friday, "ES")
+    assert is_trading_day(good_friday, "ZN")
+    assert not is_trading_day(good_friday, "CL")
+    assert not is_trading_day(date(2024, 3, 29), "ES")
+
+
+def test_saturdays_never_trade_sundays_do():
+    assert not is_trading_day(date(2026, 1, 10), "ES")
+    assert is_trading_day(date(2026, 1, 11), "ES")
+    assert not is_business_day(date(2026, 1, 11), "ES")
@@ -0,0 +1,22 @@
+import time
+
+from transfer_monitor import TransferMonitor
+
+
+def test_only_the_days_own_file_counts(tmp_path):
+    monitor = TransferMonitor(str(tmp_path), "20260115.nrd")
+    (tmp_path / "20260114.nrd").write_bytes(b"N" * 500)  # Another window's download
+    time.sleep(0.02)
+    assert monitor.sample() == 0
+    assert monitor.stalled(0.01)
+
+    (tmp_path / "20260115.nrd.tmp").write_bytes(b"N" * 300)
+    assert monitor.sample() == 300
+    assert not monitor.stalled(0.01)
+
+
+def test_rewriting_a_partial_file_counts(tmp_path):
+    (tmp_path / "20260115.nrd").write_bytes(b"N" * 500)  # Left by a stalled attempt
+    monitor = TransferMonitor(str(tmp_path), "20260115.nrd")
+    (tmp_path / "20260115.nrd").write_bytes(b"N" * 200)
+    assert monitor.sample() == 200
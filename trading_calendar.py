@@ -0,0 +1,92 @@
+"""
+CME Globex trading calendar.
+
+Rule-based exchange holidays per product group, so the miner never attempts
+a date that has no session. On the US holidays Globex either stays shut or
+halts early with no settlement, and that morning's trading belongs to the
+next trade date, so there is no replay day to download.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+from dateutil.easter import easter
+from dateutil.relativedelta import relativedelta, MO, TH
+
+PRODUCT_GROUPS = {
+    "equity": ("ES", "MES", "NQ", "MNQ", "RTY", "M2K", "YM", "MYM", "EMD"),
+    "rates": ("ZB", "ZN", "ZF", "ZT", "UB"),
+    "energy": ("CL", "MCL", "QM", "NG", "QG", "RB", "HO"),
+    "metals": ("GC", "MGC", "SI", "SIL", "HG", "PL", "PA"),
+    "fx": ("6E", "6J", "6B", "6A", "6C", "6S", "M6E"),
+    "ags": ("ZC", "ZS", "ZW", "ZL", "ZM", "LE", "HE"),
+}
+
+# Years where Good Friday fell on a US payrolls release and CME kept
+# equity and interest rate futures open for an abbreviated session.
+# There is no rule to compute this: CME announces it each year, so the
+# table is maintained by hand from its holiday calendar (checked through 2026;
+# 2024 and 2025 had no payrolls on Good Friday and closed as usual).
+GOOD_FRIDAY_SESSIONS = {
+    "equity": (2012, 2015, 2021, 2023, 2026),
+    "rates": (2012, 2015, 2021, 2023, 2026),
+}
+
+
+def get_product_group(symbol):
+    """Returns the product group for a root symbol (e.g. 'MNQ' -> 'equity'). Unknown symbols trade like equity."""
+    for group, symbols in PRODUCT_GROUPS.items():
+        if symbol in symbols:
+            return group
+    return "equity"
+
+
+def _observed(day):
+    """Weekend holidays move to the nearest weekday (Saturday -> Friday, Sunday -> Monday)."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def get_cme_holidays(year, group="equity"):
+    """Returns the frozenset of CME Globex non-session dates in a year for a product group."""
+    holidays = set()
+
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # Never moved back into the previous year
+        holidays.add(_observed(new_year))
+
+    holidays.add(date(year, 1, 1) + relativedelta(weekday=MO(3)))    # Martin Luther King Jr. Day
+    holidays.add(date(year, 2, 1) + relativedelta(weekday=MO(3)))    # Presidents Day
+    if year not in GOOD_FRIDAY_SESSIONS.get(group, ()):
+        holidays.add(easter(year) - timedelta(days=2))               # Good Friday
+    holidays.add(date(year, 5, 31) + relativedelta(weekday=MO(-1)))  # Memorial Day
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))                   # Juneteenth
+    holidays.add(_observed(date(year, 7, 4)))                        # Independence Day
+    holidays.add(date(year, 9, 1) + relativedelta(weekday=MO(1)))    # Labor Day
+    holidays.add(date(year, 11, 1) + relativedelta(weekday=TH(4)))   # Thanksgiving
+    holidays.add(_observed(date(year, 12, 25)))                      # Christmas
+
+    # A fixed-date holiday on a Sunday also cancels that evening's reopen
+    for fixed in (new_year, date(year, 7, 4), date(year, 12, 25)):
+        if fixed.weekday() == 6:
+            holidays.add(fixed)
+
+    return frozenset(holidays)
+
+
+def is_trading_day(day, symbol):
+    """True if NinjaTrader can have a replay file for this date (no Saturdays, no exchange holidays)."""
+    if day.weekday() == 5:
+        return False
+    return day not in get_cme_holidays(day.year, get_product_group(symbol))
+
+
+def is_business_day(day, symbol):
+    """True for exchange business days (Monday-Friday, not a holiday). Used for expiry rules."""
+    if day.weekday() >= 5:
+        return False
+    return day not in get_cme_holidays(day.year, get_product_group(symbol))
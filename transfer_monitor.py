@@ -0,0 +1,75 @@
+"""
+Download progress of one session's replay file.
+
+While NinjaTrader downloads a session it writes into db/replay/<contract>
+(the .nrd itself or a temporary file next to it). The monitor stats just
+those files: it records their sizes when the download starts and sums how
+many bytes have been written since, so the engine can tell a slow but
+healthy day from a hung one and log the transfer rate. Other files in the
+folder (another window's download of the same contract) don't count.
+"""
+import os
+import time
+
+TEMP_SUFFIXES = (".tmp",)  # Names the day may be written under before the .nrd appears
+
+
+def file_sizes(folder, names):
+    """{file name: size} for the names that exist in folder."""
+    sizes = {}
+    for name in names:
+        try:
+            sizes[name] = os.stat(os.path.join(folder, name)).st_size
+        except OSError:
+            pass  # Not there (yet), or renamed away (temp file)
+    return sizes
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024.0
+    return f"{count:.1f} GB"
+
+
+class TransferMonitor:
+    def __init__(self, folder, filename):
+        """filename: the .nrd being downloaded; its temp names are watched too."""
+        self.folder = folder
+        self.names = [filename] + [filename + suffix for suffix in TEMP_SUFFIXES]
+        self.baseline = file_sizes(folder, self.names)
+        self.sizes = dict(self.baseline)
+        self.started = time.monotonic()
+        self.bytes = 0
+        self.last_growth = None  # monotonic time bytes last increased (None until the first byte)
+
+    def sample(self):
+        """Re-stats the watched files and returns the bytes written since the monitor started."""
+        written = 0
+        for name, size in file_sizes(self.folder, self.names).items():
+            last = self.sizes.get(name, 0)
+            written += size - last if size >= last else size  # Shrunk: rewritten from the start
+            self.sizes[name] = size
+        if written > 0:
+            self.bytes += written
+            self.last_growth = time.monotonic()
+        return self.bytes
+
+    def landed(self):
+        """True when the .nrd is on disk and was created or written since the monitor started."""
+        self.sample()
+        filename = self.names[0]
+        return filename in self.sizes and (filename not in self.baseline or self.bytes > 0)
+
+    def idle_for(self):
+        """Seconds since bytes last arrived, or since the monitor started (the click) if none have yet."""
+        return time.monotonic() - (self.last_growth or self.started)
+
+    def stalled(self, window):
+        """True once no bytes arrived for window seconds, counting from the click until the first byte."""
+        return self.idle_for() > window
+
+    def describe(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return f"{format_bytes(self.bytes)} in {elapsed:.1f}s ({format_bytes(self.bytes / elapsed)}/s)"
@@ -0,0 +1,182 @@
+"""
+Priority order for the (contract, date) work queue.
+
+By default the shared queue walks each contract newest first, front
+contract to deep history ("chain"). A PriorityPolicy changes what is
+handed out next:
+
+    1. needed ranges: dates a backtest is blocked on, from a needs file
+       or added at runtime (the coordinator's POST /needs)
+    2. recent sessions (policy "recent"): sessions within recent_days
+       calendar days of the mine's newest date, newest first. One cutoff
+       for the whole chain, so in a deep mine this is the front contract
+       (and the one before it around a roll)
+    3. deep history, in chain order
+
+The needs file is re-read whenever it changes, so a range added during
+an overnight run is picked up by the next free window. One range per
+line, dates as YYYY-MM-DD, '#' starts a comment:
+
+    ES 03-26 2025-12-01 2025-12-19   # one contract
+    NQ 2025-11-03 2025-11-07         # any NQ contract
+    CL 02-26 2025-12-15              # a single day
+
+Needed ranges only reorder the planned dates. A range outside the chain
+(older than the mine's depth) is not added to the plan.
+"""
+import os
+import threading
+from collections import namedtuple
+from datetime import date, timedelta
+
+from contract_utils import parse_nt8_contract
+
+PRIORITY_POLICIES = ("chain", "recent")
+
+TIER_NEEDED = 0
+TIER_RECENT = 1
+TIER_HISTORY = 2
+
+
+class NeededRange(namedtuple("NeededRange", ["target", "start", "end"])):
+    """target is a contract ("ES 03-26") or a root symbol ("ES", any of its contracts)."""
+
+    def matches(self, contract, day):
+        if not self.start <= day <= self.end:
+            return False
+        if " " in self.target:
+            return contract == self.target
+        return contract.split()[0] == self.target
+
+    def __str__(self):
+        if self.start == self.end:
+            return f"{self.target} {self.start}"
+        return f"{self.target} {self.start} -> {self.end}"
+
+
+def make_needed_range(target, start, end=None):
+    """Validated NeededRange. Dates may be date objects or YYYY-MM-DD strings."""
+    target = " ".join(target.split())
+    if not target:
+        raise ValueError("Needed range without a contract or symbol")
+    if " " in target:
+        parse_nt8_contract(target)  # Fail early on a malformed contract
+    else:
+        target = target.upper()
+    if isinstance(start, str):
+        start = date.fromisoformat(start)
+    if end is None:
+        end = start
+    elif isinstance(end, str):
+        end = date.fromisoformat(end)
+    if end < start:
+        start, end = end, start
+    return NeededRange(target, start, end)
+
+
+def parse_needed_range(line):
+    """'ES 03-26 2025-12-01 2025-12-19' -> NeededRange. Raises ValueError."""
+    tokens = line.split()
+    dates = []
+    while tokens and len(dates) < 2:
+        try:
+            dates.insert(0, date.fromisoformat(tokens[-1]))
+        except ValueError:
+            break
+        tokens.pop()
+    if not dates:
+        raise ValueError(f"No date in needed range '{line.strip()}'")
+    return make_needed_range(" ".join(tokens), *dates)
+
+
+def load_needed_ranges(path):
+    """Reads a needs file. Returns (ranges, errors), errors as 'line N: message'."""
+    ranges, errors = [], []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                ranges.append(parse_needed_range(line))
+            except ValueError as e:
+                errors.append(f"line {number}: {e}")
+    return ranges, errors
+
+
+class PriorityPolicy:
+    def __init__(self, mode="recent", recent_days=10, needs_path=None, today=None, log=None):
+        """
+        mode: "chain" (deep history in chain order) or "recent" (sessions near the newest date first)
+        today: newest date of the mine (default today); recent means within recent_days calendar days of it
+        needs_path: optional needs file, re-read when it changes
+        """
+        if mode not in PRIORITY_POLICIES:
+            raise ValueError(f"Unknown priority policy '{mode}'")
+        self.mode = mode
+        self.recent_days = recent_days
+        self.needs_path = needs_path
+        self.today = today
+        self.log = log or (lambda text: None)
+        self._lock = threading.Lock()
+        self._file_ranges = []
+        self._added = []
+        self._file_stamp = None
+
+    def add(self, target, start, end=None):
+        """Adds a needed range at runtime; it takes effect on the next hand-out."""
+        needed = make_needed_range(target, start, end)
+        with self._lock:
+            self._added.append(needed)
+        self.log(f"Needed range added: {needed}")
+        return needed
+
+    def refresh(self):
+        """Re-reads the needs file if it changed. Returns True when it did."""
+        if not self.needs_path:
+            return False
+        try:
+            stat = os.stat(self.needs_path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._file_stamp:
+            return False
+        self._file_stamp = stamp
+        ranges, errors = [], []
+        if stamp is not None:
+            try:
+                ranges, errors = load_needed_ranges(self.needs_path)
+            except OSError as e:
+                errors = [str(e)]
+        for error in errors:
+            self.log(f"Needs file {self.needs_path}: {error}")
+        with self._lock:
+            self._file_ranges = ranges
+        self.log(f"Needs file loaded: {len(ranges)} ranges")
+        return True
+
+    def needs(self):
+        self.refresh()
+        with self._lock:
+            return self._file_ranges + self._added
+
+    def recent_since(self):
+        """Oldest date that still counts as recent, or None when the policy has no recent tier."""
+        if self.mode != "recent":
+            return None
+        return (self.today or date.today()) - timedelta(days=self.recent_days)
+
+    def tier(self, contract, day, needs, recent_since):
+        if any(needed.matches(contract, day) for needed in needs):
+            return TIER_NEEDED
+        if recent_since is not None and day >= recent_since:
+            return TIER_RECENT
+        return TIER_HISTORY
+
+
+def create_policy(config, log=None):
+    """The config's PriorityPolicy, or None for the plain chain walk without a needs file."""
+    if config.priority == "chain" and not config.needs_path:
+        return None
+    return PriorityPolicy(config.priority, config.recent_days, config.needs_path, config.start_date, log)